@@ -1,14 +1,10 @@
 import random
-import sys
-sys.path.append('C:\\Python')
 
 path_map = 'ost000a.map'
 
-import u_grid
-import u_lists
-
-from astar_original import AStar
-from kastar import KAStar
+from f_kastar import u_grid
+from f_kastar import u_lists
+from f_kastar import AStar, KAStar
 
 def check(lists):
     grid = u_grid.lists_to_grid(lists)
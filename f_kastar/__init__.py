@@ -0,0 +1,74 @@
+"""
+===============================================================================
+ KA* (K-Goal A*) Path-Finding on Grids.
+-------------------------------------------------------------------------------
+ Usage:
+    from f_kastar import KAStar, load_map
+    grid = load_map('lak102d.map.zip')
+    kastar = KAStar(grid, start, goals)
+-------------------------------------------------------------------------------
+ Importing the Package is cheap: Submodules (and NumPy) are loaded on first
+  Access of a public Name, so a spawned Worker pays only for what it uses.
+ Self-Tests are run separately by: python -m f_kastar.selftest
+===============================================================================
+"""
+import importlib
+
+
+# Public Name -> Submodule that defines it (stable Import Surface)
+_EXPORTS = {'KAStar': 'kastar',
+            'AStar': 'astar_original',
+            'JPS': 'jps',
+            'SearchContext': 'context',
+            'BatchExecutor': 'batch',
+            'Graph': 'graph',
+            'State': 'state',
+            'Heuristic': 'heuristic',
+            'Hierarchy': 'hpa',
+            'Landmarks': 'landmarks',
+            'Stats': 'stats',
+            'Node': 'node',
+            'Opened': 'opened',
+            'OpenedHeap': 'opened',
+            'OpenedBucket': 'opened',
+            'load_map': 'u_map',
+            'load_scen': 'u_map',
+            'load_header': 'u_map',
+            'load_graph': 'u_cache',
+            'load_landmarks': 'u_cache',
+            'load_jumps': 'u_cache'}
+
+_SUBMODULES = ('astar_original', 'batch', 'benchmark', 'context', 'graph',
+               'heuristic', 'hpa', 'jps', 'kastar', 'landmarks', 'node',
+               'opened', 'state', 'stats', 'u_cache', 'u_grid', 'u_lists',
+               'u_map', 'u_random')
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    ===========================================================================
+     Description: Load lazily the Submodule of a public Name (PEP 562).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. name : str (Public Name or Submodule Name).
+    ===========================================================================
+     Return: object (Class, Function or Module).
+    ===========================================================================
+    """
+    if name in _EXPORTS:
+        module = importlib.import_module('.' + _EXPORTS[name], __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module {0!r} has no attribute {1!r}'
+                             .format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
@@ -0,0 +1,423 @@
+import math
+
+from . import u_grid
+from .node import Node
+from .opened import Opened
+from .graph import Graph
+from .landmarks import check_octile
+
+class AStar:
+    def __init__(self, grid, start, goal, opened=Opened, graph=None,
+                 landmarks=None, bidirectional=False, stats=None):
+        """
+        ===================================================================
+         Description: A* Algorithm.
+        ===================================================================
+         Arguments:
+        -------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start Idd).
+            3. goals : set of int (Goal Idd).
+            4. opened : class (Opened Backend: Opened, OpenedHeap or
+                                OpenedBucket from the opened module) or
+                        Opened instance (cleared and reused).
+            5. graph : Graph (Compiled Grid, reused between Queries on the
+                               same Map; compiled here if None).
+            6. landmarks : Landmarks (ALT Tables of the Map, built on a
+                                       Graph of the same Connectivity,
+                                       tighten the Manhattan Heuristic)
+                           or None.
+            7. bidirectional : bool (Search from both the Start and the
+                                      Goal, see _run_bidirectional()).
+            8. stats : Stats (Counters, Timers and Callbacks of the Search)
+                              or None (no Instrumentation).
+        -------------------------------------------------------------------
+            A Goal in another Connected Component than the Start is not
+             searched (reachable is False and run() ends at once).
+        ===================================================================
+        """  
+        self.start = start
+        self.goal = goal
+        self.grid = grid
+        self.graph = graph if graph is not None else Graph(grid)
+        check_octile(landmarks, self.graph.octile)
+        self.landmarks = landmarks
+        self.reachable = self.graph.is_reachable(start, goal)
+        
+        self.best = Node(start)
+        self.best.g = 0
+        self.best.f = 0
+        
+        # Idds of the Closed Nodes
+        self.closed = set()
+        self.g = {start: 0}
+        if isinstance(opened, type):
+            self.opened = opened()
+        else:
+            self.opened = opened
+            self.opened.clear()
+        self.opened.push(self.best)   
+        self._pop = self.opened.pop
+        self._get_edges = self.graph.get_edges
+        self.stats = stats
+        
+        self.bidirectional = bidirectional
+        if bidirectional:
+            # Backward Search from the Goal (G, Fathers by Idd per Side)
+            node = Node(goal)
+            node.g = 0
+            node.f = 0
+            self.g_back = {goal: 0}
+            self.opened_back = type(self.opened)()
+            self.opened_back.push(node)
+            self._fathers = ({start: None}, {goal: None})
+            self.meet = start if (start == goal) else None
+            self._pop_back = self.opened_back.pop
+            self._get_edges_back = self.graph.get_edges_reverse
+        if stats is not None:
+            phases = [('pop', '_pop'), ('expand', '_expand'),
+                      ('neighbors', '_get_edges'), ('heuristic', '_get_h')]
+            if bidirectional:
+                phases += [('pop', '_pop_back'),
+                           ('neighbors', '_get_edges_back')]
+            stats.attach(self, phases)
+        
+    
+    def run(self):
+        """
+        =======================================================================
+         Description: Run A* Algorithm.
+        =======================================================================
+        """
+        if not self.reachable:
+            self.best = None
+            return
+        if self.bidirectional:
+            self._run_bidirectional()
+            return
+        while (True):
+            if (self.opened.is_empty()):
+                self.best = None
+                return
+            self.best = self._pop()
+            self.closed.add(self.best.idd)
+            if self.stats is not None:
+                self.stats.popped += 1
+            if (self.best.idd == self.goal):
+                if self.stats is not None:
+                    self.stats.goal(self.goal, self.best.g)
+                return
+           
+            self._expand()    
+            
+            
+    def get_path(self):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Return: List of Idds (None if the Goal was not reached).
+        =======================================================================
+        """
+        if self.bidirectional:
+            if self.meet is None:
+                return None
+            # Start ... Meet by the Forward Fathers, then ... Goal Backward
+            path = list()
+            idd = self.meet
+            while (idd is not None):
+                path.append(idd)
+                idd = self._fathers[0][idd]
+            path.reverse()
+            idd = self._fathers[1][self.meet]
+            while (idd is not None):
+                path.append(idd)
+                idd = self._fathers[1][idd]
+            return path
+        if (self.best is None) or (self.best.idd != self.goal):
+            return None
+        node = self.best
+        path = [node.idd]
+        while (node.idd != self.start):
+            node = node.father
+            path.append(node.idd)
+        path.reverse()
+        return path
+            
+        
+       
+    def _expand(self):   
+        """
+        ===================================================================
+         Description: Expand the Best Node's Children.
+        ===================================================================
+        """     
+        stats = self.stats
+        if stats is not None:
+            stats.expand(self.best.idd)
+        for idd, cost in zip(*self._get_edges(self.best.idd)):
+            if idd in self.closed:
+                continue
+            g_new = self.best.g + cost
+            if self.g.get(idd, math.inf) <= g_new:
+                continue
+            self.g[idd] = g_new
+            child = Node(idd)
+            if self.opened.contains(child):
+                self.opened.remove(child)
+                if stats is not None:
+                    stats.reopened += 1
+            self._update_node(child,self.best,g_new)
+            self.opened.push(child)
+            if stats is not None:
+                stats.push(len(self.opened))
+            
+            
+    def _update_node(self, node, father, g):
+        """
+        =======================================================================
+         Description: Update Node.
+        =======================================================================
+         Attributes:
+        -----------------------------------------------------------------------
+            1. node : Node (node to update)
+            2. father : Node
+            3. g : int
+            4. goals : set of int (active goals)
+        =======================================================================
+        """
+        node.father = father
+        node.g = g
+        node.f = node.g + self._get_h(node.idd, self.goal)
+
+
+    def _get_h(self, idd, target):
+        """
+        =======================================================================
+         Description: Return the Heuristic from the Idd to the Target.
+        =======================================================================
+        """
+        if self.graph.octile:
+            h = u_grid.octile_distance(self.grid,idd,target)
+        else:
+            h = u_grid.manhattan_distance(self.grid,idd,target)
+        if self.landmarks is not None:
+            h = max(h, self.landmarks.get(idd,target))
+        if (self.graph.cost_min != 1):
+            h *= self.graph.cost_min
+        return h
+
+
+    def _run_bidirectional(self):
+        """
+        =======================================================================
+         Description: Run Bidirectional (front-to-end) A* Algorithm.
+        -----------------------------------------------------------------------
+            1. The Forward Side searches from the Start to the Goal and the
+                Backward Side from the Goal to the Start (reverse Edges),
+                each by the Heuristic to its own Target.
+            2. The Side with the smaller Opened is expanded next.
+            3. A G improved on a Node known by the other Side gives a Path
+                of G plus the other Side's G: the best is mu at the Meet.
+            4. Stop when the popped F >= mu: F of a Side's Opened is a
+                lower Bound of every Path not found yet (admissible H).
+        =======================================================================
+        """
+        opened = (self.opened, self.opened_back)
+        pops = (self._pop, self._pop_back)
+        gs = (self.g, self.g_back)
+        targets = (self.goal, self.start)
+        edges = (self._get_edges, self._get_edges_back)
+        stats = self.stats
+        mu = 0 if (self.meet is not None) else math.inf
+        while not (opened[0].is_empty() or opened[1].is_empty()):
+            side = 0 if (len(opened[0]) <= len(opened[1])) else 1
+            other = 1 - side
+            best = pops[side]()
+            if stats is not None:
+                stats.popped += 1
+            if (best.f >= mu):
+                break
+            self.closed.add(best.idd)
+            if stats is not None:
+                stats.expand(best.idd)
+            for idd, cost in zip(*edges[side](best.idd)):
+                g_new = best.g + cost
+                if (gs[side].get(idd, math.inf) <= g_new):
+                    continue
+                if (stats is not None) and (idd in gs[side]):
+                    stats.reopened += 1
+                gs[side][idd] = g_new
+                self._fathers[side][idd] = best.idd
+                child = Node(idd)
+                if opened[side].contains(child):
+                    opened[side].remove(child)
+                child.g = g_new
+                child.f = g_new + self._get_h(idd, targets[side])
+                opened[side].push(child)
+                if stats is not None:
+                    stats.push(len(opened[side]))
+                if (idd in gs[other]) and (g_new + gs[other][idd] < mu):
+                    mu = g_new + gs[other][idd]
+                    self.meet = idd
+        if self.meet is None:
+            self.best = None
+            return
+        self.best = Node(self.goal)
+        self.best.g = mu
+        if stats is not None:
+            stats.goal(self.goal, mu)
+
+    
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+    
+    import sys
+    import random
+    from . import u_random
+    
+    def tester_run():         
+        grid = u_grid.gen_symmetric_grid(4)        
+        start = 0
+        goal = 12
+        astar = AStar(grid,start,goal)        
+        astar.run()
+        closed_true = {0,4,8,12}
+        p1 = closed_true == astar.closed     
+        
+        grid = u_grid.gen_symmetric_grid(4)
+        grid[0][2] = -1
+        grid[1][2] = -1
+        start = 0
+        goal = 3       
+        astar = AStar(grid,start,goal)
+        astar.run()
+        closed_true = {0,1,3,4,5,7,9,10,11}
+        p2 = closed_true == astar.closed
+        
+        # Landmarks of the 4-connected Graph on the octile Graph
+        from . import landmarks
+        tables = landmarks.select(Graph(grid), 2)
+        try:
+            AStar(grid,start,goal,graph=Graph(grid,octile=True),
+                  landmarks=tables)
+            p3 = False
+        except ValueError:
+            p3 = True
+        
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):        
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))            
+            
+    def tester_get_path():
+        grid = u_grid.gen_symmetric_grid(4)
+        start = 0
+        goal = 12
+        astar = AStar(grid,start,goal)
+        astar.run()
+        optimal_path = [0,4,8,12]
+        p1 = astar.get_path() == optimal_path
+        
+        grid = u_grid.gen_symmetric_grid(4)
+        grid[1][1] = -1
+        grid[2][1] = -1
+        start = 8
+        goal = 10
+        astar = AStar(grid,start,goal)
+        astar.run()
+        optimal_path = [8,12,13,14,10]
+        p2 = astar.get_path() == optimal_path
+        
+        # Goal behind a Wall is reported (not reached), not an Error
+        grid = u_grid.gen_symmetric_grid(4)
+        grid[:, 2] = -1
+        for bidirectional in (False, True):
+            astar = AStar(grid,0,3,bidirectional=bidirectional)
+            astar.run()
+            p2 = p2 and (not astar.reachable) and (astar.get_path() is None)
+        
+        p3 = True
+        for i in range(1000):
+            n = u_random.get_random_int(3,10)
+            grid = u_grid.gen_symmetric_grid(n)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = idds_valid[1]
+            astar = AStar(grid,start,goal)
+            astar.run()
+            len_optimal = u_grid.manhattan_distance(grid,start,goal)+1
+            if len(astar.get_path()) != len_optimal:
+                p3 = False
+        
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):        
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
+    def tester_bidirectional():
+        import math
+        from .opened import OpenedHeap
+        p1 = True
+        p2 = True
+        for i in range(300):
+            grid = u_grid.gen_obstacles_grid(u_random.get_random_int(3,15),
+                                             random.choice([0,20,40]))
+            costs = None
+            if (i % 3 == 2):
+                costs = u_grid.dict_to_costs(grid, u_grid.gen_dict_weights(grid.size))
+            graph = Graph(grid, octile=(i % 2 == 0), costs=costs)
+            idds_valid = u_grid.get_valid_idds(grid)
+            if (len(idds_valid) < 2):
+                continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goal = random.choice(idds_valid[:2])
+            astar = AStar(grid,start,goal,OpenedHeap,graph)
+            astar.run()
+            astar_bi = AStar(grid,start,goal,OpenedHeap,graph,bidirectional=True)
+            astar_bi.run()
+            if (astar.best is None) != (astar_bi.best is None):
+                p1 = False
+                continue
+            if astar.best is None:
+                continue
+            if not math.isclose(astar.best.g, astar_bi.best.g):
+                p1 = False
+            path = astar_bi.get_path()
+            if (path[0] != start) or (path[-1] != goal):
+                p2 = False
+            cost = 0
+            for idd_1, idd_2 in zip(path, path[1:]):
+                neighbors, costs_edges = graph.get_edges(idd_1)
+                if idd_2 not in neighbors:
+                    p2 = False
+                    break
+                cost += costs_edges[neighbors.index(idd_2)]
+            if not math.isclose(cost, astar.best.g, abs_tol=1e-9):
+                p2 = False
+        
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):        
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
+    print('\n====================\nStart Tester\n====================')    
+    tester_run()
+    tester_get_path()
+    tester_bidirectional()
+    print('====================\nEnd Tester\n====================')        
+    
+    
+#tester()
+    
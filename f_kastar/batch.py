@@ -0,0 +1,503 @@
+"""
+===============================================================================
+ Batch Execution of independent (start, goals) Queries on one Map.
+-------------------------------------------------------------------------------
+ Usage:
+    with BatchExecutor(grid, graph, processes=4) as executor:
+        for res in executor.map(queries, ordered=False, timeout=1.0):
+            print(res['index'], res['status'], res['costs'])
+-------------------------------------------------------------------------------
+ The Grid, the compiled Graph and the precomputed Tables (Landmarks, JPS+
+  Jumps) are copied once into one multiprocessing.shared_memory Block. The
+  Workers map the Arrays read-only from it, so no Array is pickled per
+  Worker or per Query. A Query only sends its Start and Goals.
+===============================================================================
+"""
+import time
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .graph import Graph
+from .landmarks import Landmarks, check_octile
+from .opened import OpenedHeap
+from .state import State
+from .stats import Stats
+
+
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+
+ENGINES = ('kastar', 'jps')
+
+# Search Objects of a Pool Worker Process (set once by _init_worker, an
+#  in-process Executor keeps its own on the Instance)
+_worker = dict()
+
+
+class BatchExecutor:
+    """
+    ===========================================================================
+     Description: Process Pool running KA* (or JPS) Queries on one Map.
+    ---------------------------------------------------------------------------
+        1. Queries are scheduled in Chunks (one Pickle and one IPC Round
+            per Chunk instead of per Query).
+        2. Results stream back as dicts in the Order of the Queries or
+            as soon as they are done (ordered=False, by their index).
+        3. A Query running longer than its Timeout is stopped at its next
+            Expansion and returns the Goals found so far (status timeout).
+        4. processes=0 runs the Queries in this Process (no Pool).
+        5. The Shared Memory Block is freed by close() (or the with Block),
+            else when the Executor is garbage collected.
+    ===========================================================================
+    """
+
+    def __init__(self, grid, graph=None, landmarks=None, table=None,
+                 engine='kastar', incremental=True, processes=None,
+                 chunksize=8, start_method=None):
+        """
+        =======================================================================
+         Description: Init Batch Executor (starts the Pool).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. graph : Graph (compiled here if None).
+            3. landmarks : Landmarks (ALT Tables of the Map, only for the
+                                       'kastar' Engine) or None.
+            4. table : Numpy Array of int32 (JPS+ Jump Table) or None.
+            5. engine : str ('kastar' or 'jps').
+            6. incremental : bool (KA* incremental re-prioritization).
+            7. processes : int (Amount of Workers, os.cpu_count() if None,
+                                 0 to run in this Process).
+            8. chunksize : int (Default Amount of Queries per Task).
+            9. start_method : str ('fork', 'spawn', 'forkserver' or None
+                                   for the Platform Default).
+        =======================================================================
+        """
+        if engine not in ENGINES:
+            raise ValueError('engine must be one of {0}'.format(ENGINES))
+        if (engine == 'jps') and (landmarks is not None):
+            raise ValueError("landmarks are not used by engine='jps'")
+        if graph is None:
+            graph = Graph(grid)
+        check_octile(landmarks, graph.octile)
+        graph.get_components()
+        self.chunksize = chunksize
+        self.processes = processes
+        self._pool = None
+        self._shm = None
+        self._finalizer = None
+        self._worker = None
+        spec = {'engine': engine, 'incremental': incremental,
+                'octile': graph.octile}
+        arrays = {'grid': grid, 'indptr': graph.indptr,
+                  'indices': graph.indices, 'weights': graph.weights,
+                  'components': graph.components, 'costs': graph.costs,
+                  'table': table}
+        if landmarks is not None:
+            arrays['landmarks_idds'] = landmarks.idds
+            arrays['landmarks_dists'] = landmarks.dists
+        arrays = {name: np.asarray(array) for name, array in arrays.items()
+                  if array is not None}
+        if (processes == 0):
+            self._worker = _build_worker(spec, arrays)
+            return
+        self._shm, spec['layout'] = _share(arrays)
+        spec['name'] = self._shm.name
+        # Safety Net if close() is never called (the Block outlives us)
+        self._finalizer = weakref.finalize(self, _free, self._shm)
+        try:
+            context = multiprocessing.get_context(start_method)
+            self._pool = context.Pool(processes, _init_worker, (spec,))
+        except BaseException:
+            self.close()
+            raise
+
+
+    def map(self, queries, ordered=True, chunksize=None, timeout=None,
+            with_paths=True):
+        """
+        =======================================================================
+         Description: Run the Queries and yield their Results.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. queries : iterable of tuple (start, goals) : (int, iterable
+                                                             of int).
+            2. ordered : bool (Yield in the Order of the Queries, else as
+                                soon as each Chunk is done).
+            3. chunksize : int (Queries per Task, self.chunksize if None).
+            4. timeout : float (Seconds per Query, None for no Limit).
+            5. with_paths : bool (Send back the Paths, not only the Costs).
+        =======================================================================
+         Return: Generator of dict (index, start, status, costs {goal: cost},
+                  paths {goal: path} or None, unreachable, expanded, time
+                  and error on status error).
+        =======================================================================
+        """
+        items = ((i, int(start), [int(goal) for goal in goals], timeout,
+                  with_paths) for i, (start, goals) in enumerate(queries))
+        if self._pool is None:
+            for item in items:
+                yield _run_query(item, self._worker)
+            return
+        chunksize = chunksize or self.chunksize
+        if ordered:
+            results = self._pool.imap(_run_query, items, chunksize)
+        else:
+            results = self._pool.imap_unordered(_run_query, items, chunksize)
+        for res in results:
+            yield res
+
+
+    def close(self):
+        """
+        =======================================================================
+         Description: Stop the Workers and free the Shared Memory.
+        =======================================================================
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._finalizer()
+            self._shm = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+
+class _Timeout(Exception):
+    """
+    ===========================================================================
+     Description: Raised inside a Search when its Query is out of Time.
+    ===========================================================================
+    """
+
+
+
+def _share(arrays):
+    """
+    ===========================================================================
+     Description: Copy the Arrays into one new Shared Memory Block.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. arrays : dict str:Numpy Array.
+    ===========================================================================
+     Return: tuple (shm, layout) : (SharedMemory, dict str:(dtype, shape,
+              offset)).
+    ===========================================================================
+    """
+    layout = dict()
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, array.shape, offset)
+        # Keep every Array aligned as in the Compiled Map Files
+        offset += -(-array.nbytes // 64) * 64
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        dtype, shape, offset = layout[name]
+        view = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+        view[...] = array
+        del view
+    return shm, layout
+
+
+def _free(shm):
+    """
+    ===========================================================================
+     Description: Close and unlink the Shared Memory Block.
+    ===========================================================================
+    """
+    shm.close()
+    shm.unlink()
+
+
+def _attach(name, layout):
+    """
+    ===========================================================================
+     Description: Map the Arrays of a Shared Memory Block (read-only).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. name : str (Name of the Shared Memory Block).
+        2. layout : dict str:(dtype, shape, offset) (from _share()).
+    ===========================================================================
+     Return: tuple (shm, arrays) : (SharedMemory, dict str:Numpy Array).
+    ===========================================================================
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = dict()
+    for key, (dtype, shape, offset) in layout.items():
+        array = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[key] = array
+    return shm, arrays
+
+
+def _init_worker(spec):
+    """
+    ===========================================================================
+     Description: Build the Search Objects of a Pool Worker (once per
+                   Process) from the Shared Memory Block.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. spec : dict (engine, incremental, octile and the name and
+                        layout of the Shared Memory Block).
+    ===========================================================================
+    """
+    shm, arrays = _attach(spec['name'], spec['layout'])
+    _worker.update(_build_worker(spec, arrays))
+    _worker['shm'] = shm
+
+
+def _build_worker(spec, arrays):
+    """
+    ===========================================================================
+     Description: Return the Search Objects of a Worker.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. spec : dict (engine, incremental and octile).
+        2. arrays : dict str:Numpy Array (Grid, Graph and Tables).
+    ===========================================================================
+     Return: dict (search : callable (start, goals, stats) -> Search,
+                   state : State, opened : OpenedHeap).
+    ===========================================================================
+    """
+    worker = dict()
+    grid = arrays['grid']
+    graph = Graph(grid, arrays['indptr'], arrays['indices'],
+                  arrays.get('weights'), None, arrays['components'],
+                  spec['octile'], arrays.get('costs'))
+    landmarks = None
+    if 'landmarks_idds' in arrays:
+        landmarks = Landmarks(arrays['landmarks_idds'],
+                              arrays['landmarks_dists'], spec['octile'])
+    if (spec['engine'] == 'jps'):
+        from .jps import JPS
+        worker['search'] = lambda start, goals, stats: JPS(
+            grid, start, goals, worker['opened'], spec['incremental'],
+            graph, worker['state'], arrays.get('table'), stats)
+    else:
+        from .kastar import KAStar
+        worker['search'] = lambda start, goals, stats: KAStar(
+            grid, start, goals, worker['opened'], spec['incremental'],
+            graph, worker['state'], landmarks, stats)
+    worker['state'] = State(grid.size)
+    worker['opened'] = OpenedHeap()
+    return worker
+
+
+def _run_query(item, worker=None):
+    """
+    ===========================================================================
+     Description: Run one Query in the Worker and return its Result.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. item : tuple (index, start, goals, timeout, with_paths).
+        2. worker : dict (Search Objects from _build_worker(), the ones of
+                           this Pool Worker Process if None).
+    ===========================================================================
+     Return: dict (see BatchExecutor.map()).
+    ===========================================================================
+    """
+    index, start, goals, timeout, with_paths = item
+    clock = time.perf_counter
+    t = clock()
+    res = {'index': index, 'start': start, 'status': STATUS_OK,
+           'costs': dict(), 'paths': dict() if with_paths else None,
+           'unreachable': list(), 'expanded': 0, 'time': 0.0}
+    on_expand = None
+    if timeout is not None:
+        deadline = t + timeout
+        def on_expand(idd):
+            if (clock() > deadline):
+                raise _Timeout()
+    stats = Stats(on_expand=on_expand)
+    if worker is None:
+        worker = _worker
+    try:
+        search = worker['search'](start, goals, stats)
+        res['unreachable'] = list(search.unreachable)
+        for goal, cost, path in search.iter_results():
+            res['costs'][goal] = cost
+            if with_paths:
+                res['paths'][goal] = path
+    except _Timeout:
+        res['status'] = STATUS_TIMEOUT
+    except Exception as e:
+        res['status'] = STATUS_ERROR
+        res['error'] = repr(e)
+    res['expanded'] = stats.expanded
+    res['time'] = clock() - t
+    return res
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+    from . import landmarks as u_landmarks
+    from .kastar import KAStar
+
+    random.seed(5)
+    grid = u_grid.gen_obstacles_grid(30, 25)
+    graph = Graph(grid)
+    idds = [int(x) for x in graph.get_valid_idds()]
+    queries = [(random.choice(idds), random.sample(idds, 4))
+               for _ in range(40)]
+    costs_true = list()
+    for start, goals in queries:
+        kastar = KAStar(grid, start, goals, graph=graph)
+        kastar.run()
+        costs_true.append({goal: kastar.get_cost(goal) for goal in goals
+                           if goal not in kastar.unreachable})
+
+    def tester_map():
+        lms = u_landmarks.select(graph, 4)
+        p1 = p2 = True
+        for processes in (0, 2):
+            with BatchExecutor(grid, graph, lms, processes=processes,
+                               chunksize=3) as executor:
+                res = list(executor.map(queries))
+                p1 = p1 and [r['index'] for r in res] == list(range(40))
+                p1 = p1 and [r['costs'] for r in res] == costs_true
+                p1 = p1 and all(r['status'] == STATUS_OK for r in res)
+                res = list(executor.map(queries, ordered=False,
+                                        with_paths=False))
+                res.sort(key=lambda r: r['index'])
+                p2 = p2 and [r['costs'] for r in res] == costs_true
+                p2 = p2 and all(r['paths'] is None for r in res)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_spawn():
+        from . import jps
+        table = jps.build_table(graph)
+        with BatchExecutor(grid, graph, table=table, engine='jps',
+                           processes=2, start_method='spawn') as executor:
+            res = list(executor.map(queries[:10], chunksize=4))
+        p1 = [r['costs'] for r in res] == costs_true[:10]
+        p2 = all(r['paths'][goal][-1] == goal
+                 for r in res for goal in r['costs'])
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_timeout():
+        with BatchExecutor(grid, graph, processes=0) as executor:
+            res = list(executor.map(queries, timeout=0))
+        p1 = all(r['status'] == (STATUS_TIMEOUT if costs else STATUS_OK)
+                 for r, costs in zip(res, costs_true))
+        p2 = all(r['expanded'] == 1 for r, costs in zip(res, costs_true)
+                 if costs)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_in_process():
+        # Two in-process Executors on different Grids side by side
+        grid_open = u_grid.gen_symmetric_grid(5)
+        grid_walled = u_grid.gen_symmetric_grid(5)
+        grid_walled[:, 2] = -1
+        executor_open = BatchExecutor(grid_open, processes=0)
+        executor_walled = BatchExecutor(grid_walled, processes=0)
+        res_open = list(executor_open.map([(0, [4])]))[0]
+        res_walled = list(executor_walled.map([(0, [4])]))[0]
+        p1 = (res_open['costs'] == {4: 4}) and not res_open['unreachable']
+        p2 = ((res_walled['costs'] == dict()) and
+              (res_walled['unreachable'] == [4]))
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_free():
+        def is_freed(name):
+            try:
+                shared_memory.SharedMemory(name).close()
+            except FileNotFoundError:
+                return True
+            return False
+        # Pool fails to start: the Block is freed before the Error
+        names = list()
+        share = globals()['_share']
+        def spy(arrays):
+            shm, layout = share(arrays)
+            names.append(shm.name)
+            return shm, layout
+        globals()['_share'] = spy
+        try:
+            BatchExecutor(grid, graph, processes=1, start_method='bad')
+            p1 = False
+        except ValueError:
+            p1 = True
+        finally:
+            globals()['_share'] = share
+        p1 = p1 and (len(names) == 1) and is_freed(names[0])
+        # Executor dropped without close()
+        executor = BatchExecutor(grid, graph, processes=1)
+        name = executor._shm.name
+        executor._pool.terminate()
+        del executor
+        p2 = is_freed(name)
+        # Landmarks are not used by JPS
+        try:
+            BatchExecutor(grid, graph, u_landmarks.select(graph, 2),
+                          engine='jps', processes=0)
+            p3 = False
+        except ValueError:
+            p3 = True
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_map()
+    tester_spawn()
+    tester_timeout()
+    tester_in_process()
+    tester_free()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,412 @@
+"""
+===============================================================================
+ Benchmark KA* against K separate A* runs on MovingAI Maps.
+-------------------------------------------------------------------------------
+ Usage:
+    python -m f_kastar.benchmark lak102d.map.zip lak104d.map.zip --k 10 --out res.csv
+    python -m f_kastar.benchmark maze.map --scen maze.map.scen --k 20 --out res.json
+    python -m f_kastar.benchmark lak102d.map.zip --scen lak102d.map.scen --octile
+-------------------------------------------------------------------------------
+ Without a .scen File random Scenarios are generated (reproducible by seed).
+ Scenario Entries with the same Bucket and Start are grouped into K-Goal
+  Queries (random Scenarios draw up to K Goals of one Bucket per Start).
+ Results are aggregated per Bucket and written as CSV or JSON, so the Files
+  of different Commits can be compared.
+===============================================================================
+"""
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+
+from . import u_map
+from . import u_grid
+from . import u_cache
+from .kastar import KAStar
+from .astar_original import AStar
+from .opened import Opened, OpenedHeap, OpenedBucket
+from .state import State
+
+
+OPENED = {'set': Opened, 'heap': OpenedHeap, 'bucket': OpenedBucket}
+
+FIELDS = ['map', 'bucket', 'queries', 'goals',
+          'kastar_time', 'kastar_expanded', 'kastar_heuristic',
+          'kastar_peak_kb',
+          'astar_time', 'astar_expanded', 'astar_peak_kb',
+          'agree', 'unreached', 'optimal_agree', 'optimal_compared']
+
+
+def gen_scen(graph, n, seed=0, k=1):
+    """
+    ===========================================================================
+     Description: Return n random Scenario Entries on the Graph's Grid.
+    ---------------------------------------------------------------------------
+        1. Bucket is the Manhattan Distance // 4 (MovingAI uses Length // 4).
+        2. Each random Start gets up to k Goals of the Bucket of its first
+            random Goal, so to_queries() can group them into one Query.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. graph : Graph
+        2. n : int (Amount of Entries).
+        3. seed : int
+        4. k : int (Goals per Start).
+    ===========================================================================
+     Return: list of tuple (bucket, start, goal, optimal=None).
+    ===========================================================================
+    """
+    rnd = random.Random(seed)
+    idds = graph.get_valid_idds()
+    rows, cols = np.divmod(idds, graph.grid.shape[1])
+    idds = idds.tolist()
+    scen = list()
+    while (len(scen) < n):
+        start, goal = rnd.sample(idds, 2)
+        bucket = u_grid.manhattan_distance(graph.grid, start, goal) // 4
+        row, col = u_grid.to_row_col(graph.grid, start)
+        buckets = (np.abs(rows - row) + np.abs(cols - col)) // 4
+        others = [x for x in np.flatnonzero(buckets == bucket).tolist()
+                  if idds[x] not in (start, goal)]
+        goals = [goal] + [idds[x] for x in
+                          rnd.sample(others, min(k - 1, len(others)))]
+        for goal in goals[:n - len(scen)]:
+            scen.append((bucket, start, goal, None))
+    return scen
+
+
+def to_queries(scen, k):
+    """
+    ===========================================================================
+     Description: Group Scenario Entries of each Bucket and Start into
+                   K-Goal Queries.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. scen : list of tuple (bucket, start, goal, optimal).
+        2. k : int (Goals per Query).
+    ===========================================================================
+     Return: list of tuple (bucket, start, goals).
+    ===========================================================================
+    """
+    groups = dict()
+    for bucket, start, goal, optimal in scen:
+        groups.setdefault((bucket, start), list()).append(goal)
+    queries = list()
+    for bucket, start in sorted(groups):
+        goals = list(dict.fromkeys(groups[(bucket, start)]))
+        for first in range(0, len(goals), k):
+            queries.append((bucket, start, goals[first:first+k]))
+    return queries
+
+
+def run_query(graph, state, start, goals, opened, incremental, memory,
+              landmarks=None, optimals=None):
+    """
+    ===========================================================================
+     Description: Run KA* and K A* on the Query and return the Metrics.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. graph : Graph
+        2. state : State (reused by KA* between the Queries).
+        3. start : int (Start Idd).
+        4. goals : list of int (Goal Idds).
+        5. opened : class (Opened Backend).
+        6. incremental : bool (KA* incremental re-prioritization).
+        7. memory : bool (Measure Peak Memory in a separate traced Run).
+        8. landmarks : Landmarks (ALT Tables of both Searches) or None.
+        9. optimals : list of float (Published Optimal Costs of the Goals,
+                                      None where unknown) or None.
+    ===========================================================================
+     Return: dict str:float (Metrics of the Query).
+    ===========================================================================
+    """
+    grid = graph.grid
+
+    def run_kastar():
+        kastar = KAStar(grid, start, goals, opened, incremental, graph, state,
+                        landmarks)
+        kastar.run()
+        return kastar
+
+    def run_astars():
+        astars = list()
+        for goal in goals:
+            astar = AStar(grid, start, goal, opened, graph, landmarks)
+            astar.run()
+            astars.append(astar)
+        return astars
+
+    res = dict()
+    t = time.perf_counter()
+    kastar = run_kastar()
+    res['kastar_time'] = time.perf_counter() - t
+    res['kastar_expanded'] = len(state.get_closed())
+    res['kastar_heuristic'] = kastar.counter_heuristic
+
+    t = time.perf_counter()
+    astars = run_astars()
+    res['astar_time'] = time.perf_counter() - t
+    res['astar_expanded'] = sum(len(astar.closed) for astar in astars)
+
+    res['kastar_peak_kb'] = None
+    res['astar_peak_kb'] = None
+    if memory:
+        for name, func in (('kastar', run_kastar), ('astar', run_astars)):
+            tracemalloc.start()
+            func()
+            res[name + '_peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+
+    agree = 0
+    unreached = 0
+    for goal, astar in zip(goals, astars):
+        path_kastar = kastar.get_path(goal)
+        if (astar.best is None):
+            unreached += 1
+        if (path_kastar is None) == (astar.best is None):
+            if (path_kastar is None) or math.isclose(kastar.get_cost(goal),
+                                                     astar.best.g):
+                agree += 1
+    res['agree'] = agree
+    res['unreached'] = unreached
+    res['optimal_agree'] = None
+    res['optimal_compared'] = None
+    if optimals is not None:
+        compared = [(goal, optimal) for goal, optimal in zip(goals, optimals)
+                    if optimal is not None]
+        res['optimal_agree'] = sum(
+            math.isclose(kastar.get_cost(goal), optimal, rel_tol=1e-6)
+            for goal, optimal in compared)
+        res['optimal_compared'] = len(compared)
+    res['goals'] = len(goals)
+    return res
+
+
+def run(path_map, path_scen=None, k=10, n=100, opened='heap',
+        incremental=True, memory=False, seed=0, chars_valid=u_map.CHARS_VALID,
+        landmarks=0, octile=False, path_cache=None):
+    """
+    ===========================================================================
+     Description: Run the Benchmark on one Map and return Rows per Bucket.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to the .map or .map.zip File).
+        2. path_scen : str (Path to the .scen File, None for random).
+        3. k : int (Goals per Query).
+        4. n : int (Amount of random Scenario Entries, without .scen).
+        5. opened : str (Opened Backend: 'set', 'heap' or 'bucket', the
+                          last only for unit-cost 4-connected Maps).
+        6. incremental : bool (KA* incremental re-prioritization).
+        7. memory : bool (Measure Peak Memory).
+        8. seed : int
+        9. chars_valid : str (Passable Chars).
+        10. landmarks : int (Amount of ALT Landmarks, 0 for Manhattan only).
+        11. octile : bool (8-connected Moves with sqrt(2) Diagonals).
+        12. path_cache : str (Directory of the Compiled Map Files, next to
+                               the Map if None).
+    ===========================================================================
+     Return: list of dict (Row per Bucket, keys are FIELDS).
+    ===========================================================================
+    """
+    paths_cache = (None, None)
+    if path_cache is not None:
+        name = os.path.join(path_cache, os.path.basename(path_map))
+        prefix = '.oct' if octile else ''
+        paths_cache = (u_cache.get_path_cache(name, prefix),
+                       u_cache.get_path_cache(name, prefix + '.alt'))
+    graph = u_cache.load_graph(path_map, paths_cache[0],
+                               chars_valid=chars_valid, octile=octile)
+    # Edge Weights (octile or weighted Terrain) give non-integer F
+    if (opened == 'bucket') and (graph.weights is not None):
+        raise ValueError("opened='bucket' needs a unit-cost 4-connected Map")
+    state = State(graph.grid.size)
+    tables = None
+    if landmarks:
+        tables = u_cache.load_landmarks(path_map, landmarks, paths_cache[1],
+                                        chars_valid=chars_valid, graph=graph,
+                                        octile=octile)
+    if path_scen is None:
+        scen = gen_scen(graph, n, seed, k)
+    else:
+        scen = u_map.load_scen(path_scen)
+    # Published Costs (only from a .scen File) by (Start, Goal)
+    optimal = {(start, goal): cost for bucket, start, goal, cost in scen
+               if cost is not None}
+    rows = dict()
+    for bucket, start, goals in to_queries(scen, k):
+        optimals = None
+        if optimal:
+            optimals = [optimal.get((start, goal)) for goal in goals]
+        res = run_query(graph, state, start, goals, OPENED[opened],
+                        incremental, memory, tables, optimals)
+        row = rows.setdefault(bucket, {'map': os.path.basename(path_map),
+                                       'bucket': bucket, 'queries': 0})
+        row['queries'] += 1
+        for field in FIELDS[3:]:
+            if (res[field] is None):
+                row[field] = None
+            elif field.endswith('_peak_kb'):
+                row[field] = max(row.get(field) or 0, res[field])
+            else:
+                row[field] = row.get(field, 0) + res[field]
+    return [rows[bucket] for bucket in sorted(rows)]
+
+
+def write(rows, path, meta=None):
+    """
+    ===========================================================================
+     Description: Write the Rows to CSV or JSON (by the File Extension).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. rows : list of dict (keys are FIELDS).
+        2. path : str (Path to .csv or .json File).
+        3. meta : dict (Run Information, only in JSON).
+    ===========================================================================
+    """
+    if path.endswith('.json'):
+        with open(path, 'w') as file:
+            json.dump({'meta': meta or dict(), 'rows': rows}, file, indent=1)
+        return
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def get_meta(args):
+    """
+    ===========================================================================
+     Description: Return Run Information (Commit, Python, Arguments).
+    ===========================================================================
+    """
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                         stderr=subprocess.DEVNULL)
+        commit = commit.decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit,
+            'python': platform.python_version(),
+            'args': vars(args)}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='KA* vs K A* Benchmark.')
+    parser.add_argument('maps', nargs='+', help='.map or .map.zip Files')
+    parser.add_argument('--scen', nargs='*', default=None,
+                        help='.scen Files (one per Map)')
+    parser.add_argument('--k', type=int, default=10, help='Goals per Query')
+    parser.add_argument('--n', type=int, default=100,
+                        help='Random Scenario Entries per Map (no .scen)')
+    parser.add_argument('--opened', choices=sorted(OPENED), default='heap')
+    parser.add_argument('--full', action='store_true',
+                        help='KA* full (not incremental) re-prioritization')
+    parser.add_argument('--memory', action='store_true',
+                        help='Measure Peak Memory (extra traced Runs)')
+    parser.add_argument('--octile', action='store_true',
+                        help='8-connected Moves (MovingAI octile Maps)')
+    parser.add_argument('--landmarks', type=int, default=0,
+                        help='ALT Landmarks per Map (0 for Manhattan only)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help='.csv or .json File')
+    args = parser.parse_args(argv)
+    if (args.opened == 'bucket') and args.octile:
+        parser.error('--opened bucket needs integer F (not with --octile)')
+
+    rows = list()
+    for i, path_map in enumerate(args.maps):
+        path_scen = args.scen[i] if args.scen else None
+        rows.extend(run(path_map, path_scen, args.k, args.n, args.opened,
+                        not args.full, args.memory, args.seed,
+                        landmarks=args.landmarks, octile=args.octile))
+    if args.out:
+        write(rows, args.out, get_meta(args))
+    writer = csv.DictWriter(sys.stdout, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import tempfile
+
+    def tester_to_queries():
+        scen = [(0,1,2,None), (1,3,4,None), (0,1,6,None), (0,7,2,None),
+                (0,1,8,None), (1,1,9,None)]
+        queries = to_queries(scen, 2)
+        queries_true = [(0,1,[2,6]), (0,1,[8]), (0,7,[2]), (1,1,[9]),
+                        (1,3,[4])]
+        p1 = (queries == queries_true)
+        with tempfile.TemporaryDirectory() as folder:
+            graph = u_cache.load_graph('lak102d.map.zip',
+                                       os.path.join(folder, 'g.fkc'))
+            scen = gen_scen(graph, 20, k=5)
+        p2 = (len(scen) == 20) and (len(set(x[1] for x in scen)) < 20)
+        p2 = p2 and all(len(goals) <= 5 for b, s, goals in to_queries(scen, 5))
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_run():
+        with tempfile.TemporaryDirectory() as folder:
+            rows = run('lak102d.map.zip', k=5, n=20, path_cache=folder)
+            rows_alt = run('lak102d.map.zip', k=5, n=20, landmarks=4,
+                           path_cache=folder)
+            rows_oct = run('lak102d.map.zip', k=5, n=20, octile=True,
+                           path_cache=folder)
+            p3 = len(os.listdir(folder)) == 3
+            try:
+                run('lak102d.map.zip', k=5, n=20, opened='bucket',
+                    octile=True, path_cache=folder)
+                p3 = False
+            except ValueError:
+                pass
+        p1 = sum(row['goals'] for row in rows) <= 20
+        p1 = p1 and (sum(row['queries'] for row in rows) < 20)
+        p2 = all(row['agree'] == row['goals'] for row in rows)
+        p2 = p2 and all(row['agree'] == row['goals'] for row in rows_alt)
+        p2 = p2 and (sum(row['kastar_expanded'] for row in rows_alt) <=
+                     sum(row['kastar_expanded'] for row in rows))
+        p2 = p2 and all(row['agree'] == row['goals'] for row in rows_oct)
+        p2 = p2 and all(row['optimal_compared'] is None for row in rows)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_to_queries()
+    tester_run()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
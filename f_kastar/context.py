@@ -0,0 +1,304 @@
+import numpy as np
+
+from .graph import Graph
+from .state import State
+from .opened import OpenedHeap
+from .kastar import KAStar
+from .astar_original import AStar
+
+
+class SearchContext:
+    """
+    ===========================================================================
+     Description: Search Context bound to one Grid (Map).
+    ---------------------------------------------------------------------------
+        The compiled Graph, the State Arrays (G, Father, Closed) and
+         the Opened are allocated once and reused by all the Queries.
+         Every Query starts a new Generation of the State, so the Values
+         of the previous Query are invalidated lazily and a Query never
+         pays O(Cells) work on an unchanged Map.
+    ===========================================================================
+    """
+
+    def __init__(self, grid, graph=None, opened=OpenedHeap, incremental=True,
+                 landmarks=None, stats=None):
+        """
+        =======================================================================
+         Description: Init Search Context.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Serialized Grid.
+            2. graph : Graph (compiled here if None).
+            3. opened : class (Opened Backend of the Searches).
+            4. incremental : bool (KA* incremental re-prioritization).
+            5. landmarks : Landmarks (ALT Tables of the Map) or None.
+            6. stats : Stats (summed over all the Queries) or None.
+        =======================================================================
+        """
+        self.grid = grid
+        self.graph = graph if graph is not None else Graph(grid)
+        self.state = State(grid.size)
+        self.incremental = incremental
+        self.landmarks = landmarks
+        self.stats = stats
+        self._opened = opened()
+        self.queries = 0
+
+
+    def query(self, start, goals, run=True, reverse=False):
+        """
+        =======================================================================
+         Description: Return KA* Search of the Query (run if run=True).
+        -----------------------------------------------------------------------
+            The returned Search reads the shared State, so its Paths are
+             valid until the next Query of this Context.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start Idd).
+            2. goals : iterable of int (Goal Idds).
+            3. run : bool (Run the Search before returning it).
+            4. reverse : bool (Search along the reverse Edges, the Costs
+                                are from the Goals to the Start).
+        =======================================================================
+         Return: KAStar
+        =======================================================================
+        """
+        self.queries += 1
+        kastar = KAStar(self.grid, start, goals, self._opened,
+                        self.incremental, self.graph, self.state,
+                        self.landmarks, self.stats, reverse)
+        if run:
+            kastar.run()
+        return kastar
+
+
+    def query_astar(self, start, goal, run=True, bidirectional=False):
+        """
+        =======================================================================
+         Description: Return A* Search of the Query (run if run=True).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start Idd).
+            2. goal : int (Goal Idd).
+            3. run : bool (Run the Search before returning it).
+            4. bidirectional : bool (Bidirectional A*).
+        =======================================================================
+         Return: AStar
+        =======================================================================
+        """
+        self.queries += 1
+        astar = AStar(self.grid, start, goal, self._opened, self.graph,
+                      self.landmarks, bidirectional, self.stats)
+        if run:
+            astar.run()
+        return astar
+
+
+    def reset(self):
+        """
+        =======================================================================
+         Description: Invalidate the State and empty the Opened O(1).
+        =======================================================================
+        """
+        self.state.reset()
+        self._opened.clear()
+
+
+    def distance_matrix(self, sources, targets, with_paths=False):
+        """
+        =======================================================================
+         Description: Return the Matrix of the Costs from every Source to
+                       every Target.
+        -----------------------------------------------------------------------
+            1. Fewer (or as many) Sources than Targets: one KA* per Source
+                with all the Targets as Goals.
+            2. Fewer Targets: one KA* per Target along the reverse Edges
+                with all the Sources as Goals (exact on weighted Terrain).
+            3. All the Searches share the Graph, State and Opened of the
+                Context, so no Search pays O(Cells) Setup.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. sources : list of int (Source Idds, Rows).
+            2. targets : list of int (Target Idds, Columns).
+            3. with_paths : bool (Return also a MatrixPaths).
+        =======================================================================
+         Return: Numpy Array of float (Sources x Targets, inf where the
+                  Target is unreachable), tuple (matrix, MatrixPaths) if
+                  with_paths.
+        =======================================================================
+        """
+        sources = [int(x) for x in sources]
+        targets = [int(x) for x in targets]
+        matrix = np.full((len(sources), len(targets)), np.inf)
+        reverse = len(targets) < len(sources)
+        if not reverse:
+            for i, source in enumerate(sources):
+                kastar = self.query(source, targets)
+                matrix[i] = [kastar.get_cost(x) for x in targets]
+        else:
+            for j, target in enumerate(targets):
+                kastar = self.query(target, sources, reverse=True)
+                matrix[:, j] = [kastar.get_cost(x) for x in sources]
+        if with_paths:
+            return matrix, MatrixPaths(self, sources, targets, reverse)
+        return matrix
+
+
+
+class MatrixPaths:
+    """
+    ===========================================================================
+     Description: Lazy Paths of a Distance Matrix (paths[i, j] is the Path
+                   from the i-th Source to the j-th Target, None if
+                   unreachable).
+    ---------------------------------------------------------------------------
+        The Search of a Row (or of a Column after a reverse Search) is run
+         again by the Context on the first Access and all its Paths are
+         kept, so the other Paths of the same Row cost nothing. The Context
+         is free for other Queries between two Accesses.
+    ===========================================================================
+    """
+
+    def __init__(self, context, sources, targets, reverse):
+        """
+        =======================================================================
+         Description: Init Lazy Paths of a Distance Matrix.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. context : SearchContext
+            2. sources : list of int (Source Idds).
+            3. targets : list of int (Target Idds).
+            4. reverse : bool (The Matrix was computed by reverse Searches
+                                from the Targets).
+        =======================================================================
+        """
+        self._context = context
+        self._sources = sources
+        self._targets = targets
+        self._reverse = reverse
+        self._lines = dict()
+
+
+    def __getitem__(self, key):
+        i, j = key
+        if not self._reverse:
+            line = self._get_line(i, self._sources[i], self._targets)
+            return line[self._targets[j]]
+        line = self._get_line(j, self._targets[j], self._sources)
+        path = line[self._sources[i]]
+        return None if (path is None) else path[::-1]
+
+
+    def _get_line(self, index, start, goals):
+        """
+        =======================================================================
+         Description: Return the Paths of the Search from the Start to all
+                       the Goals (run once per Row or Column).
+        =======================================================================
+        """
+        if index not in self._lines:
+            kastar = self._context.query(start, goals, reverse=self._reverse)
+            self._lines[index] = {goal: kastar.get_path(goal)
+                                  for goal in goals}
+        return self._lines[index]
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+
+    def tester_query():
+        from . import landmarks
+        grid = u_grid.gen_obstacles_grid(12,20)
+        context = SearchContext(grid)
+        context.landmarks = landmarks.select(context.graph, 4)
+        idds_valid = u_grid.get_valid_idds(grid)
+        p1 = True
+        for i in range(50):
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:5]
+            kastar_fresh = KAStar(grid,start,goals)
+            kastar_fresh.run()
+            kastar = context.query(start,goals)
+            for goal in goals:
+                if (kastar.get_cost(goal) != kastar_fresh.get_cost(goal)):
+                    p1 = False
+                astar = context.query_astar(start,goal)
+                if (astar.best is None) != (kastar.get_path(goal) is None):
+                    p1 = False
+                astar = context.query_astar(start,goal,bidirectional=True)
+                if (astar.best is None) != (kastar.get_path(goal) is None):
+                    p1 = False
+        context.reset()
+        p2 = context.state.get_closed() == []
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_distance_matrix():
+        import math
+        random.seed(2)
+        grid = u_grid.gen_obstacles_grid(15,20)
+        costs = np.random.default_rng(2).integers(1, 5, grid.shape)
+        graph = Graph(grid, costs=costs)
+        context = SearchContext(grid, graph)
+        idds_valid = [int(x) for x in u_grid.get_valid_idds(grid)]
+
+        def get_cost(path):
+            cost = 0
+            for idd_1, idd_2 in zip(path, path[1:]):
+                idds, weights = graph.get_edges(idd_1)
+                cost += weights[idds.index(idd_2)]
+            return cost
+
+        p1 = p2 = True
+        for n, m in ((3, 7), (7, 3)):
+            sources = random.sample(idds_valid, n)
+            targets = random.sample(idds_valid, m)
+            matrix, paths = context.distance_matrix(sources, targets, True)
+            p1 = p1 and (matrix.shape == (n, m))
+            for i, source in enumerate(sources):
+                for j, target in enumerate(targets):
+                    kastar = KAStar(grid, source, [target], graph=graph)
+                    kastar.run()
+                    cost = kastar.get_cost(target)
+                    p1 = p1 and math.isclose(matrix[i, j], cost)
+                    path = paths[i, j]
+                    if (cost == math.inf):
+                        p2 = p2 and (path is None)
+                        continue
+                    p2 = p2 and (path[0] == source) and (path[-1] == target)
+                    p2 = p2 and math.isclose(get_cost(path), cost)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_query()
+    tester_distance_matrix()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,253 @@
+import numpy as np
+from . import u_grid
+
+
+class Graph:
+    """
+    ===========================================================================
+     Description: Grid compiled once into a CSR Adjacency Structure.
+    ---------------------------------------------------------------------------
+        Neighbors of Idd are indices[indptr[idd]:indptr[idd+1]] and the
+         Costs of the Edges to them are the same slice of weights (None
+         means unit Costs). Compile the Graph once per Map and pass it to
+         the Searches of all the Queries on this Map.
+        An octile Graph is 8-connected (sqrt(2) Diagonals, no Corner
+         Cutting) and its Searches use the Octile Distance Heuristic.
+        With Cell Costs (weighted Terrain) an Edge costs its Length times
+         the Cost of the entered Cell, and the Heuristics are scaled by the
+         minimum Cell Cost (cost_min) to stay admissible.
+    ===========================================================================
+    """
+
+    def __init__(self, grid, indptr=None, indices=None, weights=None,
+                 idds_valid=None, components=None, octile=False, costs=None):
+        """
+        =======================================================================
+         Description: Init Graph (compile the Grid if no CSR is given).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Serialized Grid.
+            2. indptr : Numpy Array of int (CSR Row Pointers, size+1).
+            3. indices : Numpy Array of int (CSR Neighbors).
+            4. weights : Numpy Array of float (Edge Costs) or None.
+            5. idds_valid : Numpy Array of int (Valid Idds) or None.
+            6. components : Numpy Array of int (Component Label by Idd)
+                             or None.
+            7. octile : bool (8-connected Moves, else 4-connected).
+            8. costs : Numpy Array of float (Cell Costs, Shape of the Grid)
+                        or None (all Cells cost 1).
+        =======================================================================
+        """
+        if indptr is None:
+            indptr, indices = u_grid.to_csr(grid, octile)
+        if (octile or costs is not None) and (weights is None):
+            weights = u_grid.to_weights(grid, indptr, indices, costs)
+        self.cost_min = 1
+        if costs is not None:
+            costs_valid = np.asarray(costs).ravel()[grid.ravel() >= 0]
+            if costs_valid.size:
+                self.cost_min = float(costs_valid.min())
+        self.grid = grid
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.idds_valid = idds_valid
+        self.components = components
+        self.octile = octile
+        self.costs = costs
+        self.padded = None
+
+
+    def get_valid_idds(self):
+        """
+        =======================================================================
+         Description: Return Numpy Array of Valid Idds (computed once).
+        =======================================================================
+        """
+        if self.idds_valid is None:
+            self.idds_valid = np.flatnonzero(self.grid.ravel() >= 0)
+        return self.idds_valid
+
+
+    def get_components(self):
+        """
+        =======================================================================
+         Description: Return Numpy Array of Component Labels by Idd
+                       (computed once).
+        =======================================================================
+        """
+        if self.components is None:
+            self.components = u_grid.to_components(self.indptr, self.indices)
+        return self.components
+
+
+    def get_padded(self):
+        """
+        =======================================================================
+         Description: Return the Valid Mask padded by a Blocked Border as
+                       bytes of (rows+2) x (cols+2) (computed once).
+        -----------------------------------------------------------------------
+            Cell (row, col) is at (row+1)*(cols+2) + col+1, so a Step in
+             any Direction stays in the Buffer without Bounds Checks.
+        =======================================================================
+        """
+        if self.padded is None:
+            rows, cols = self.grid.shape
+            valid = np.zeros((rows+2, cols+2), dtype=np.uint8)
+            valid[1:-1,1:-1] = self.grid >= 0
+            self.padded = valid.tobytes()
+        return self.padded
+
+
+    def is_reachable(self, idd_1, idd_2):
+        """
+        =======================================================================
+         Description: Return True if there is a Path between the Idds.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd_1 : int (Node's Id).
+            2. idd_2 : int (Node's Id).
+        =======================================================================
+         Return: bool
+        =======================================================================
+        """
+        components = self.get_components()
+        return bool(components[idd_1] == components[idd_2])
+
+
+    def get_neighbors(self, idd):
+        """
+        =======================================================================
+         Description: Return List of Neighbors of the Idd (int).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: list of int (Neighbors' Id).
+        =======================================================================
+        """
+        return self.indices[self.indptr[idd]:self.indptr[idd+1]].tolist()
+
+
+    def get_edges(self, idd):
+        """
+        =======================================================================
+         Description: Return Neighbors of the Idd and the Costs to them.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: list of int, list of float (Neighbors, Costs).
+        =======================================================================
+        """
+        first = self.indptr[idd]
+        last = self.indptr[idd+1]
+        neighbors = self.indices[first:last].tolist()
+        if self.weights is None:
+            return neighbors, [1] * len(neighbors)
+        return neighbors, self.weights[first:last].tolist()
+
+
+    def get_edges_reverse(self, idd):
+        """
+        =======================================================================
+         Description: Return Predecessors of the Idd and the Costs from them
+                       (for Searches backward from a Goal).
+        -----------------------------------------------------------------------
+            The Moves are symmetric, only the Cell Costs differ: the Move
+             into the Idd costs its Length times the Cost of the Idd.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: list of int, list of float (Predecessors, Costs).
+        =======================================================================
+        """
+        if self.costs is None:
+            return self.get_edges(idd)
+        first = self.indptr[idd]
+        last = self.indptr[idd+1]
+        neighbors = self.indices[first:last]
+        costs = np.asarray(self.costs).ravel()
+        lengths = self.weights[first:last] / costs[neighbors]
+        return neighbors.tolist(), (lengths * costs[idd]).tolist()
+
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+
+    def tester_get_neighbors():
+        p1 = True
+        for i in range(20):
+            grid = u_grid.gen_obstacles_grid(7,30)
+            graph = Graph(grid)
+            for idd in u_grid.get_valid_idds(grid):
+                row, col = u_grid.to_row_col(grid, idd)
+                if (graph.get_neighbors(idd) != u_grid.get_neighbors(grid,row,col)):
+                    p1 = False
+        p2 = len(graph) == grid.size
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_is_reachable():
+        grid = u_grid.serialize(np.array([[0,0,-1,0],
+                                          [0,-1,0,0]]))
+        graph = Graph(grid)
+        p1 = graph.is_reachable(0,4) and graph.is_reachable(3,6)
+        p2 = not graph.is_reachable(0,3) and not graph.is_reachable(0,2)
+        p3 = graph.get_components() is graph.get_components()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_octile():
+        grid = u_grid.serialize(np.array([[0,0],[0,0]]))
+        graph = Graph(grid, octile=True)
+        neighbors, costs = graph.get_edges(0)
+        p1 = neighbors == [1,2,3] and costs == [1,1,u_grid.SQRT2]
+        p2 = Graph(grid).get_edges(0) == ([1,2],[1,1])
+        graph = Graph(grid, costs=np.array([[1,2],[3,0.5]]))
+        p2 = p2 and graph.get_edges(0) == ([1,2],[2,3]) and graph.cost_min == 0.5
+        p2 = p2 and graph.get_edges_reverse(0) == ([1,2],[1,1])
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_get_neighbors()
+    tester_is_reachable()
+    tester_octile()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,315 @@
+import numpy as np
+
+from .landmarks import get_bounds, check_octile
+from .u_grid import SQRT2
+
+
+class Heuristic:
+    """
+    ===========================================================================
+     Description: Manhattan (or Octile) Distance to the nearest of the
+                   active Goals.
+    ---------------------------------------------------------------------------
+        The Rows and Cols of the active Goals are kept in Numpy Arrays, so
+         the minimum over all the Goals is one vectorized call for a single
+         Node or for a whole batch of Nodes.
+        With Landmarks the Distance to each Goal is the maximum of the
+         Manhattan Distance and the Landmark (ALT) Lower Bound, whose Goal
+         Columns of the Tables are kept next to the Rows and Cols.
+        On weighted Terrain the Distances are scaled by the minimum Cell
+         Cost (every Step costs at least that much).
+    ===========================================================================
+    """
+
+    # Maximum amount of (Node, Goal) pairs evaluated at once by get_many()
+    CHUNK = 1 << 20
+
+    def __init__(self, grid, goals, landmarks=None, octile=False, scale=1):
+        """
+        =======================================================================
+         Description: Init Heuristic with the Grid and the Goals.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Serialized Grid.
+            2. goals : iterable of int (Goal Idd).
+            3. landmarks : Landmarks (ALT Tables of the Map, built on a
+                                       Graph of the same Connectivity)
+                           or None.
+            4. octile : bool (Octile Distance for 8-connected Graphs).
+            5. scale : float (minimum Cell Cost of weighted Graphs).
+        =======================================================================
+        """
+        check_octile(landmarks, octile)
+        self._cols = grid.shape[1]
+        self._octile = octile
+        self._scale = scale
+        self.goals = list()
+        self._rows_goals = np.empty(0, dtype=np.int64)
+        self._cols_goals = np.empty(0, dtype=np.int64)
+        if (landmarks is not None) and not len(landmarks):
+            landmarks = None
+        self._landmarks = landmarks
+        if landmarks is not None:
+            self._dists_goals = np.empty((len(landmarks), 0), dtype=np.int32)
+        self.counter = 0
+        self.add(goals)
+
+
+    def add(self, goals):
+        """
+        =======================================================================
+         Description: Add Goals to the active Goals (existing are ignored).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goals : iterable of int (Goal Idd).
+        =======================================================================
+        """
+        goals = [goal for goal in dict.fromkeys(goals) if goal not in self.goals]
+        if not goals:
+            return
+        idds = np.array(goals, dtype=np.int64)
+        self.goals.extend(goals)
+        self._rows_goals = np.concatenate((self._rows_goals, idds // self._cols))
+        self._cols_goals = np.concatenate((self._cols_goals, idds % self._cols))
+        if self._landmarks is not None:
+            self._dists_goals = np.concatenate(
+                (self._dists_goals, self._landmarks.dists[:, idds]), axis=1)
+
+
+    def remove(self, goal):
+        """
+        =======================================================================
+         Description: Remove the Goal from the active Goals (shrink Arrays).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal Idd).
+        =======================================================================
+        """
+        i = self.goals.index(goal)
+        del self.goals[i]
+        self._rows_goals = np.delete(self._rows_goals, i)
+        self._cols_goals = np.delete(self._cols_goals, i)
+        if self._landmarks is not None:
+            self._dists_goals = np.delete(self._dists_goals, i, axis=1)
+
+
+    def get(self, idd):
+        """
+        =======================================================================
+         Description: Return Distance Estimate from the Node to the nearest
+                       active Goal and this Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+        =======================================================================
+         Return: h, goal : int, int (inf, None if there are no active Goals).
+        =======================================================================
+        """
+        if not self.goals:
+            return float('Infinity'), None
+        self.counter += len(self.goals)
+        row, col = divmod(idd, self._cols)
+        dists = self._get_dists(row, col)
+        if self._landmarks is not None:
+            bounds = get_bounds(self._landmarks.dists[:, idd, np.newaxis],
+                                self._dists_goals)
+            dists = np.maximum(dists, bounds.max(axis=0))
+        if (self._scale != 1):
+            dists = dists * self._scale
+        i = int(dists.argmin())
+        return dists[i].item(), self.goals[i]
+
+
+    def get_many(self, idds):
+        """
+        =======================================================================
+         Description: Vectorized get() for a batch of Nodes.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : list of int (Nodes' Id).
+        =======================================================================
+         Return: hs, goals : list of int, list of int (per Node).
+        =======================================================================
+        """
+        if not self.goals:
+            return [float('Infinity')] * len(idds), [None] * len(idds)
+        self.counter += len(self.goals) * len(idds)
+        idds = np.asarray(idds, dtype=np.int64)
+        is_float = self._octile or (self._scale != 1)
+        hs = np.empty(len(idds), dtype=np.float64 if is_float else np.int64)
+        nearest = np.empty(len(idds), dtype=np.int64)
+        size = len(self.goals)
+        if self._landmarks is not None:
+            size *= len(self._landmarks)
+        step = max(1, self.CHUNK // size)
+        for first in range(0, len(idds), step):
+            chunk = idds[first:first+step]
+            rows = (chunk // self._cols)[:, np.newaxis]
+            cols = (chunk % self._cols)[:, np.newaxis]
+            dists = self._get_dists(rows, cols)
+            if self._landmarks is not None:
+                bounds = get_bounds(self._landmarks.dists[:, chunk, np.newaxis],
+                                    self._dists_goals[:, np.newaxis, :])
+                dists = np.maximum(dists, bounds.max(axis=0))
+            if (self._scale != 1):
+                dists = dists * self._scale
+            i = dists.argmin(axis=1)
+            hs[first:first+step] = dists[np.arange(len(chunk)), i]
+            nearest[first:first+step] = i
+        goals = [self.goals[i] for i in nearest.tolist()]
+        return hs.tolist(), goals
+
+
+    def _get_dists(self, rows, cols):
+        """
+        =======================================================================
+         Description: Return Distances from the Rows and Cols (broadcast) to
+                       the active Goals.
+        =======================================================================
+        """
+        d_rows = np.abs(self._rows_goals - rows)
+        d_cols = np.abs(self._cols_goals - cols)
+        if not self._octile:
+            return d_rows + d_cols
+        return (np.maximum(d_rows, d_cols)
+                + (SQRT2 - 1) * np.minimum(d_rows, d_cols))
+
+
+    def __len__(self):
+        return len(self.goals)
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+
+    def tester_get():
+        grid = u_grid.gen_symmetric_grid(5)
+        heuristic = Heuristic(grid, [4,20])
+        p1 = heuristic.get(0) == (4,4)
+        p2 = heuristic.get(15) == (1,20)
+        p3 = heuristic.counter == 4
+        heuristic.remove(20)
+        p4 = heuristic.get(15) == (7,4)
+        heuristic.remove(4)
+        p5 = heuristic.get(15)[1] is None
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_get_many():
+        grid = u_grid.gen_symmetric_grid(10)
+        p1 = True
+        for i in range(100):
+            goals = random.sample(range(100), random.randint(1,10))
+            idds = random.sample(range(100), 20)
+            heuristic = Heuristic(grid, goals)
+            hs, nearest = heuristic.get_many(idds)
+            for idd, h, goal in zip(idds, hs, nearest):
+                h_true = min(u_grid.manhattan_distance(grid,idd,x) for x in goals)
+                if (h != h_true) or (u_grid.manhattan_distance(grid,idd,goal) != h):
+                    p1 = False
+            if (heuristic.counter != len(goals) * len(idds)):
+                p1 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_landmarks():
+        from . import landmarks
+        from .graph import Graph
+        p1 = True
+        p2 = True
+        for i in range(20):
+            grid = u_grid.gen_obstacles_grid(12,30)
+            graph = Graph(grid)
+            tables = landmarks.select(graph, 3, seed=i)
+            idds_valid = graph.get_valid_idds().tolist()
+            goals = random.sample(idds_valid, 4)
+            heuristic = Heuristic(grid, goals, tables)
+            dists = [landmarks.get_distances(graph, goal) for goal in goals]
+            hs, nearest = heuristic.get_many(idds_valid)
+            for idd, h, goal in zip(idds_valid, hs, nearest):
+                if (heuristic.get(idd) != (h, goal)):
+                    p1 = False
+                h_manhattan = min(u_grid.manhattan_distance(grid,idd,x) for x in goals)
+                h_true = min(int(x[idd]) if x[idd] >= 0 else float('inf') for x in dists)
+                if (h < h_manhattan) or (h > h_true):
+                    p2 = False
+            heuristic.remove(goals[0])
+            if (heuristic._dists_goals.shape != (3, 3)):
+                p1 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_octile():
+        grid = u_grid.gen_symmetric_grid(10)
+        p1 = True
+        for i in range(50):
+            goals = random.sample(range(100), random.randint(1,5))
+            idds = random.sample(range(100), 10)
+            scale = random.choice([1, 0.5, 3])
+            heuristic = Heuristic(grid, goals, octile=True, scale=scale)
+            hs, nearest = heuristic.get_many(idds)
+            for idd, h, goal in zip(idds, hs, nearest):
+                h_true = min(u_grid.octile_distance(grid,idd,x) for x in goals)
+                h_true *= scale
+                if (abs(h - h_true) > 1e-9) or (heuristic.get(idd) != (h, goal)):
+                    p1 = False
+        # Landmarks of the 4-connected Graph would overestimate (h=28)
+        from . import landmarks
+        from .graph import Graph
+        grid = u_grid.gen_symmetric_grid(15)
+        tables = landmarks.select(Graph(grid, octile=True), 4)
+        h = Heuristic(grid, {224}, tables, octile=True).get(0)[0]
+        p2 = h <= u_grid.octile_distance(grid, 0, 224)
+        try:
+            Heuristic(grid, {224}, landmarks.select(Graph(grid), 4),
+                      octile=True)
+            p2 = False
+        except ValueError:
+            pass
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_get()
+    tester_get_many()
+    tester_landmarks()
+    tester_octile()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,921 @@
+"""
+===============================================================================
+ Hierarchical Path-Finding (HPA*) on Grids.
+-------------------------------------------------------------------------------
+ Usage:
+    hierarchy = Hierarchy(grid, size=16)
+    paths = hierarchy.query(start, goals)
+    paths.get_cost(goal), paths.get_path(goal)
+    grid[row, col] = -1; hierarchy.update([idd])
+-------------------------------------------------------------------------------
+ 1. The Grid is partitioned into Clusters of size x size Cells.
+ 2. Every maximal Run of Cells passable on both Sides of a Cluster Border
+     is an Entrance: one Transition in its Middle (short Runs) or two at
+     its Ends (long Runs). The Transition Cells are the Abstract Nodes.
+ 3. Abstract Edges: the Step over the Border (Inter) and the exact
+     Distances between the Abstract Nodes of a Cluster inside the Cluster
+     (Intra, by vectorized Relaxation over whole Batches of Clusters).
+ 4. A Query inserts its Start and Goals into the Abstract Graph, runs
+     KAStar (or AStar) on it and refines an Abstract Path into Cells only
+     when get_path() asks (one local A* per Intra Edge).
+-------------------------------------------------------------------------------
+ The Paths are near-optimal (they pass the Transition Cells), the Costs
+  are the exact Costs of the refined Paths.
+===============================================================================
+"""
+import math
+
+import numpy as np
+
+from .u_grid import DIRECTIONS, SQRT2
+from .graph import Graph
+from .state import State
+from .opened import OpenedHeap
+from .kastar import KAStar
+from .astar_original import AStar
+
+
+# Runs of at least ENTRANCE_LONG Cells get two Transitions (at the Ends)
+ENTRANCE_LONG = 6
+
+# Max Amount of Distance Cells relaxed at once (bounds the Memory)
+BATCH_CELLS = 2**21
+
+
+class Hierarchy:
+    """
+    ===========================================================================
+     Description: Abstract Graph of a Grid (HPA*).
+    ---------------------------------------------------------------------------
+        The Hierarchy has the Interface of a Graph over the Abstract Nodes
+         (get_edges, get_edges_reverse, get_components, is_reachable,
+         octile, cost_min), so KAStar and AStar search it unchanged.
+         get_components() returns a dict by Idd (Abstract Nodes only).
+    ===========================================================================
+    """
+
+    def __init__(self, grid, size=16, octile=False, costs=None):
+        """
+        =======================================================================
+         Description: Build the Abstract Graph of the Grid.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Serialized Grid (edited in place before update()).
+            2. size : int (Side of the Clusters in Cells).
+            3. octile : bool (8-connected, else 4-connected).
+            4. costs : Numpy Array of float (Cell Costs, Shape of the Grid)
+                        or None (all Cells cost 1).
+        =======================================================================
+        """
+        self.grid = grid
+        self.size = size
+        self.octile = octile
+        self.costs = costs
+        rows, cols = grid.shape
+        self._cols = cols
+        self._n_rows = -(-rows // size)
+        self._n_cols = -(-cols // size)
+        # Padded to whole Clusters by blocked Cells
+        shape = (self._n_rows * size, self._n_cols * size)
+        self._valid = np.zeros(shape, dtype=bool)
+        self._valid[:rows,:cols] = grid >= 0
+        self._costs = np.ones(shape, dtype=np.float64)
+        if costs is not None:
+            self._costs[:rows,:cols] = costs
+        self.cost_min = 1
+        self._update_cost_min()
+        self._borders = dict()
+        self._entrances = dict()
+        self._edges = dict()
+        self._edges_reverse = dict()
+        self._labels = None
+        self._subgraphs = dict()
+        self._state = None
+        clusters = range(self._n_rows * self._n_cols)
+        self._set_borders(self._find_borders(0, self._n_rows,
+                                             0, self._n_cols))
+        self._set_intra(clusters)
+
+
+    def query(self, start, goals):
+        """
+        =======================================================================
+         Description: Run KAStar from the Start to the Goals on the Abstract
+                       Graph.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start Idd).
+            2. goals : iterable of int (Goal Idds).
+        =======================================================================
+         Return: AbstractPaths
+        =======================================================================
+        """
+        start = int(start)
+        goals = list(dict.fromkeys(int(x) for x in goals))
+        inserted = self._insert([start] + goals)
+        try:
+            kastar = KAStar(self.grid, start, goals, OpenedHeap, False, self,
+                            self._get_state())
+            kastar.run()
+            found = {goal: (kastar.get_cost(goal), kastar.get_path(goal))
+                     for goal in goals if goal not in kastar.unreachable}
+        finally:
+            self._remove(inserted)
+        return AbstractPaths(self, start, found, kastar.unreachable)
+
+
+    def query_astar(self, start, goal):
+        """
+        =======================================================================
+         Description: Run AStar from the Start to the Goal on the Abstract
+                       Graph.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. start : int (Start Idd).
+            2. goal : int (Goal Idd).
+        =======================================================================
+         Return: AbstractPaths
+        =======================================================================
+        """
+        start = int(start)
+        goal = int(goal)
+        inserted = self._insert([start, goal])
+        try:
+            astar = AStar(self.grid, start, goal, OpenedHeap, self)
+            astar.run()
+        finally:
+            self._remove(inserted)
+        if astar.best is None:
+            return AbstractPaths(self, start, dict(), [goal])
+        found = {goal: (astar.best.g, astar.get_path())}
+        return AbstractPaths(self, start, found, list())
+
+
+    def refine(self, path):
+        """
+        =======================================================================
+         Description: Return the Cells of an Abstract Path.
+        -----------------------------------------------------------------------
+            Inter Edges are single Steps, Intra Edges are searched by A*
+             inside their Cluster (exact, as their Costs).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. path : list of int (Abstract Node Idds).
+        =======================================================================
+         Return: list of int (Cell Idds).
+        =======================================================================
+        """
+        cells = path[:1]
+        for idd_1, idd_2 in zip(path, path[1:]):
+            cluster = self._to_cluster(idd_1)
+            if (cluster != self._to_cluster(idd_2)):
+                cells.append(idd_2)
+                continue
+            cells.extend(self._get_local_path(cluster, idd_1, idd_2)[1:])
+        return cells
+
+
+    def update(self, idds):
+        """
+        =======================================================================
+         Description: Rebuild the Abstraction after Edits of the Cells.
+        -----------------------------------------------------------------------
+            1. The Borders of the touched Clusters are scanned again and
+                their Inter Edges replaced (Costs may have changed).
+            2. Intra Distances are computed again only for the touched
+                Clusters and for the Neighbors whose Entrances changed.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : iterable of int (Idds of the edited Cells of grid or
+                                        costs).
+        =======================================================================
+        """
+        touched = set()
+        for idd in idds:
+            row, col = divmod(int(idd), self._cols)
+            self._valid[row, col] = self.grid[row, col] >= 0
+            if self.costs is not None:
+                self._costs[row, col] = self.costs[row, col]
+            touched.add(self._to_cluster(int(idd)))
+        borders = dict()
+        for cluster in touched:
+            row, col = divmod(cluster, self._n_cols)
+            found = self._find_borders(max(row-1, 0),
+                                       min(row+2, self._n_rows),
+                                       max(col-1, 0),
+                                       min(col+2, self._n_cols))
+            for key, pairs in found.items():
+                if cluster in key:
+                    borders[key] = pairs
+        changed = self._set_borders(borders, force=True)
+        self._set_intra(touched | changed)
+        for cluster in touched | changed:
+            self._subgraphs.pop(cluster, None)
+        if self.costs is not None:
+            self._update_cost_min()
+
+
+    def get_edges(self, idd):
+        """
+        =======================================================================
+         Description: Return Abstract Neighbors of the Idd and the Costs
+                       to them.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Abstract Node Idd).
+        =======================================================================
+         Return: list of int, list of float (Neighbors, Costs).
+        =======================================================================
+        """
+        edges = self._edges.get(idd)
+        if not edges:
+            return list(), list()
+        return list(edges), list(edges.values())
+
+
+    def get_edges_reverse(self, idd):
+        """
+        =======================================================================
+         Description: Return Abstract Predecessors of the Idd and the Costs
+                       from them.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Abstract Node Idd).
+        =======================================================================
+         Return: list of int, list of float (Predecessors, Costs).
+        =======================================================================
+        """
+        edges = self._edges_reverse.get(idd)
+        if not edges:
+            return list(), list()
+        return list(edges), list(edges.values())
+
+
+    def get_neighbors(self, idd):
+        """
+        =======================================================================
+         Description: Return List of Abstract Neighbors of the Idd.
+        =======================================================================
+        """
+        return list(self._edges.get(idd, ()))
+
+
+    def get_components(self):
+        """
+        =======================================================================
+         Description: Return dict of Component Labels by Abstract Node
+                       (computed once after each Build or update()).
+        =======================================================================
+        """
+        if self._labels is None:
+            self._labels = dict()
+            for node in self._edges:
+                if node not in self._labels:
+                    self._label(node, len(self._labels))
+        return self._labels
+
+
+    def is_reachable(self, idd_1, idd_2):
+        """
+        =======================================================================
+         Description: Return True if there is a Path between the Abstract
+                       Nodes.
+        =======================================================================
+        """
+        labels = self.get_components()
+        return labels[idd_1] == labels[idd_2]
+
+
+    def get_entrances(self, cluster):
+        """
+        =======================================================================
+         Description: Return the Abstract Nodes (Transition Cells) of the
+                       Cluster.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. cluster : int (Cluster Index, Row-Major over the Clusters).
+        =======================================================================
+         Return: list of int (Idds).
+        =======================================================================
+        """
+        return list(self._entrances.get(cluster, ()))
+
+
+    def __len__(self):
+        return len(self._edges)
+
+
+    def _label(self, node, label):
+        """
+        =======================================================================
+         Description: Set the Label on all the Nodes connected to the Node.
+        =======================================================================
+        """
+        self._labels[node] = label
+        stack = [node]
+        while stack:
+            idd = stack.pop()
+            for neighbor in self._edges.get(idd, ()):
+                if neighbor not in self._labels:
+                    self._labels[neighbor] = label
+                    stack.append(neighbor)
+
+
+    def _find_borders(self, row_first, row_last, col_first, col_last):
+        """
+        =======================================================================
+         Description: Return the Transitions of all the Borders between the
+                       Clusters of the Range (Cluster Rows and Cols).
+        =======================================================================
+         Return: dict (cluster_1, cluster_2):list of (idd_1, idd_2) (empty
+                  for Borders without Transitions).
+        =======================================================================
+        """
+        s = self.size
+        valid = self._valid[row_first*s:row_last*s, col_first*s:col_last*s]
+        n_rows = row_last - row_first
+        n_cols = col_last - col_first
+        borders = dict()
+        # Vertical Borders: Cluster (row, col) | Cluster (row, col+1)
+        both = valid[:, s-1:-1:s] & valid[:, s::s]
+        runs = both.reshape(n_rows, s, n_cols-1).transpose(0, 2, 1)
+        for row, col in np.ndindex(n_rows, n_cols-1):
+            borders[self._to_key(row_first+row, col_first+col, 0, 1)] = list()
+        for row, col, pos in zip(*_get_transitions(runs)):
+            row_cell = (row_first + row) * s + pos
+            col_cell = (col_first + col + 1) * s - 1
+            idd = int(row_cell * self._cols + col_cell)
+            key = self._to_key(row_first+row, col_first+col, 0, 1)
+            borders[key].append((idd, idd + 1))
+        # Horizontal Borders: Cluster (row, col) over Cluster (row+1, col)
+        both = valid[s-1:-1:s, :] & valid[s::s, :]
+        runs = both.reshape(n_rows-1, n_cols, s)
+        for row, col in np.ndindex(n_rows-1, n_cols):
+            borders[self._to_key(row_first+row, col_first+col, 1, 0)] = list()
+        for row, col, pos in zip(*_get_transitions(runs)):
+            row_cell = (row_first + row + 1) * s - 1
+            col_cell = (col_first + col) * s + pos
+            idd = int(row_cell * self._cols + col_cell)
+            key = self._to_key(row_first+row, col_first+col, 1, 0)
+            borders[key].append((idd, idd + self._cols))
+        return borders
+
+
+    def _set_borders(self, borders, force=False):
+        """
+        =======================================================================
+         Description: Replace the Transitions (and Inter Edges) of Borders.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. borders : dict (from _find_borders()).
+            2. force : bool (Replace the Inter Edges also of the unchanged
+                              Borders, to take new Cell Costs).
+        =======================================================================
+         Return: set of int (Clusters whose Transitions changed).
+        =======================================================================
+        """
+        changed = set()
+        for key, pairs in borders.items():
+            pairs_old = self._borders.get(key, list())
+            if (pairs == pairs_old) and not force:
+                continue
+            if (pairs != pairs_old):
+                changed.update(key)
+            for idd_1, idd_2 in pairs_old:
+                self._remove_edge(idd_1, idd_2)
+                self._remove_edge(idd_2, idd_1)
+            for idd_1, idd_2 in pairs:
+                self._add_edge(idd_1, idd_2, self._get_cost(idd_2))
+                self._add_edge(idd_2, idd_1, self._get_cost(idd_1))
+            if pairs:
+                self._borders[key] = pairs
+            else:
+                self._borders.pop(key, None)
+        self._labels = None
+        return changed
+
+
+    def _set_intra(self, clusters):
+        """
+        =======================================================================
+         Description: Compute again the Entrances and the Intra Edges of the
+                       Clusters (in Batches of Clusters).
+        =======================================================================
+        """
+        clusters = sorted(clusters)
+        for cluster in clusters:
+            nodes = self._entrances.pop(cluster, list())
+            for idd_1 in nodes:
+                for idd_2 in nodes:
+                    self._remove_edge(idd_1, idd_2)
+            nodes = set()
+            for key in self._get_keys(cluster):
+                for pair in self._borders.get(key, ()):
+                    nodes.update(x for x in pair
+                                 if self._to_cluster(x) == cluster)
+            if nodes:
+                self._entrances[cluster] = sorted(nodes)
+        # Batches of Clusters with similar Amounts of Entrances
+        clusters = [x for x in clusters if len(self._entrances.get(x, ())) > 1]
+        clusters.sort(key=lambda x: len(self._entrances[x]))
+        cells = (self.size + 2) ** 2
+        i = 0
+        while (i < len(clusters)):
+            n_max = len(self._entrances[clusters[i]])
+            j = i + 1
+            while (j < len(clusters)):
+                n = max(n_max, len(self._entrances[clusters[j]]))
+                if ((j - i + 1) * n * cells > BATCH_CELLS):
+                    break
+                n_max = n
+                j += 1
+            batch = clusters[i:j]
+            sources = [self._entrances[x] for x in batch]
+            dists = self._get_dists(batch, sources)
+            for k, cluster in enumerate(batch):
+                nodes = sources[k]
+                locals_ = [self._to_local(x) for x in nodes]
+                for a, idd_1 in enumerate(nodes):
+                    for b, idd_2 in enumerate(nodes):
+                        dist = dists[k, a, locals_[b]]
+                        if (a != b) and (dist < math.inf):
+                            self._add_edge(idd_1, idd_2, float(dist))
+            i = j
+        self._labels = None
+
+
+    def _get_dists(self, clusters, sources):
+        """
+        =======================================================================
+         Description: Return the Distances inside the Clusters from their
+                       Source Cells to every Cell of the Cluster.
+        -----------------------------------------------------------------------
+            Sweeps as a Distance Transform over all the Clusters and Sources
+             at once: a Round relaxes the downward Moves Row by Row from the
+             top, the upward Moves from the bottom, then the Moves to the
+             right and to the left Column by Column. Rounds are repeated
+             until nothing changes (a Cell entered by a Move costs its
+             Length times its Cost), usually a few per Turn of the Paths.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. clusters : list of int (Cluster Indexes).
+            2. sources : list of list of int (Source Idds per Cluster).
+        =======================================================================
+         Return: 3D Numpy Array of float64 (Cluster x Source x Local Cell,
+                  inf if unreachable).
+        =======================================================================
+        """
+        s = self.size
+        n_sources = max(len(x) for x in sources)
+        clusters = np.asarray(clusters)
+        rows, cols = np.divmod(clusters, self._n_cols)
+        shape = (self._n_rows, s, self._n_cols, s)
+        valid = self._valid.reshape(shape)[rows, :, cols, :]
+        costs = self._costs.reshape(shape)[rows, :, cols, :]
+        padded = np.zeros((len(clusters), s+2, s+2), dtype=bool)
+        padded[:, 1:-1, 1:-1] = valid
+
+        def shifted(array, d_row, d_col):
+            return array[..., 1-d_row:s+1-d_row, 1-d_col:s+1-d_col]
+
+        # Sweeps: (Row or Column Order, Moves relaxed in the Sweep)
+        sweeps = {(1, 0): list(), (-1, 0): list(), (0, 1): list(),
+                  (0, -1): list()}
+        directions = DIRECTIONS if self.octile else DIRECTIONS[:4]
+        for d_row, d_col in directions:
+            # Move from the Cell - (d_row, d_col) into the Cell
+            allowed = valid & shifted(padded, d_row, d_col)
+            length = 1.0
+            if d_row and d_col:
+                allowed &= shifted(padded, d_row, 0) & shifted(padded, 0, d_col)
+                length = SQRT2
+            add = np.where(allowed, length * costs, math.inf)[:, None]
+            order = (d_row, 0) if d_row else (0, d_col)
+            sweeps[order].append((d_row, d_col, add))
+        dists = np.full((len(clusters), n_sources, s+2, s+2), math.inf)
+        for k, nodes in enumerate(sources):
+            for a, idd in enumerate(nodes):
+                row, col = divmod(self._to_local(idd), s)
+                dists[k, a, row+1, col+1] = 0
+        center = dists[..., 1:-1, 1:-1]
+        while True:
+            before = center.copy()
+            for (order_row, order_col), steps in sweeps.items():
+                lines = range(1, s+1)
+                if (order_row < 0) or (order_col < 0):
+                    lines = reversed(lines)
+                for line in lines:
+                    for d_row, d_col, add in steps:
+                        if order_row:
+                            target = dists[:, :, line, 1:-1]
+                            source = dists[:, :, line-d_row, 1-d_col:s+1-d_col]
+                            step = add[:, :, line-1, :]
+                        else:
+                            target = dists[:, :, 1:-1, line]
+                            source = dists[:, :, 1:-1, line-d_col]
+                            step = add[:, :, :, line-1]
+                        np.minimum(target, source + step, out=target)
+            if np.array_equal(before, center):
+                break
+        return center.reshape(len(clusters), n_sources, s*s)
+
+
+    def _insert(self, idds):
+        """
+        =======================================================================
+         Description: Insert the Idds (Start and Goals) as Abstract Nodes
+                       connected to the Nodes of their Cluster.
+        =======================================================================
+         Return: tuple (edges, idds) : (list of (int, int), list of int)
+                  (what _remove() takes back).
+        =======================================================================
+        """
+        labels = self.get_components()
+        idds = [x for x in dict.fromkeys(idds) if x not in labels]
+        by_cluster = dict()
+        for idd in idds:
+            row, col = divmod(idd, self._cols)
+            if self._valid[row, col]:
+                by_cluster.setdefault(self._to_cluster(idd), list()).append(idd)
+        edges = list()
+        for cluster, inserted in by_cluster.items():
+            entrances = self._entrances.get(cluster, list())
+            nodes = entrances + inserted
+            dists = self._get_dists([cluster], [nodes])[0]
+            for a, idd_1 in enumerate(nodes):
+                for b, idd_2 in enumerate(nodes):
+                    if (a == b) or (max(a, b) < len(entrances)):
+                        continue
+                    dist = dists[a, self._to_local(idd_2)]
+                    if (dist < math.inf):
+                        self._add_edge(idd_1, idd_2, float(dist))
+                        edges.append((idd_1, idd_2))
+        # Label by a connected Node (new Label if none: a closed Pocket)
+        for idd in idds:
+            if idd in labels:
+                continue
+            component = [idd]
+            label = None
+            seen = {idd}
+            stack = [idd]
+            while stack:
+                for neighbor in self._edges.get(stack.pop(), ()):
+                    if neighbor in seen:
+                        continue
+                    if neighbor in labels:
+                        label = labels[neighbor]
+                        continue
+                    seen.add(neighbor)
+                    component.append(neighbor)
+                    stack.append(neighbor)
+            if label is None:
+                label = -2 - idd
+            for x in component:
+                labels[x] = label
+        return edges, idds
+
+
+    def _remove(self, inserted):
+        """
+        =======================================================================
+         Description: Remove the Nodes and Edges inserted by _insert().
+        =======================================================================
+        """
+        edges, idds = inserted
+        for idd_1, idd_2 in edges:
+            self._remove_edge(idd_1, idd_2)
+        for idd in idds:
+            self._labels.pop(idd, None)
+
+
+    def _add_edge(self, idd_1, idd_2, cost):
+        self._edges.setdefault(idd_1, dict())[idd_2] = cost
+        self._edges_reverse.setdefault(idd_2, dict())[idd_1] = cost
+
+
+    def _remove_edge(self, idd_1, idd_2):
+        edges = self._edges.get(idd_1)
+        if (edges is None) or (idd_2 not in edges):
+            return
+        del edges[idd_2]
+        if not edges:
+            del self._edges[idd_1]
+        edges = self._edges_reverse[idd_2]
+        del edges[idd_1]
+        if not edges:
+            del self._edges_reverse[idd_2]
+
+
+    def _get_local_path(self, cluster, idd_1, idd_2):
+        """
+        =======================================================================
+         Description: Return the Cells of the shortest Path between two
+                       Idds of the Cluster inside the Cluster (A*).
+        =======================================================================
+        """
+        if cluster not in self._subgraphs:
+            s = self.size
+            row, col = divmod(cluster, self._n_cols)
+            rows = slice(row * s, (row + 1) * s)
+            cols = slice(col * s, (col + 1) * s)
+            grid = self.grid[rows, cols]
+            costs = None
+            if self.costs is not None:
+                costs = np.asarray(self.costs)[rows, cols]
+            graph = Graph(grid, octile=self.octile, costs=costs)
+            self._subgraphs[cluster] = (grid, graph, row * s, col * s)
+        grid, graph, row_first, col_first = self._subgraphs[cluster]
+        cols = grid.shape[1]
+
+        def to_local(idd):
+            row, col = divmod(idd, self._cols)
+            return (row - row_first) * cols + col - col_first
+
+        astar = AStar(grid, to_local(idd_1), to_local(idd_2), OpenedHeap,
+                      graph)
+        astar.run()
+        path = list()
+        for idd in astar.get_path():
+            row, col = divmod(idd, cols)
+            path.append((row_first + row) * self._cols + col_first + col)
+        return path
+
+
+    def _get_state(self):
+        """
+        =======================================================================
+         Description: Return the State of the Abstract Searches (allocated
+                       on the first Query).
+        =======================================================================
+        """
+        if self._state is None:
+            self._state = State(self.grid.size)
+        return self._state
+
+
+    def _get_cost(self, idd):
+        row, col = divmod(idd, self._cols)
+        return float(self._costs[row, col])
+
+
+    def _get_keys(self, cluster):
+        """
+        =======================================================================
+         Description: Return the Keys of the (up to 4) Borders of a Cluster.
+        =======================================================================
+        """
+        row, col = divmod(cluster, self._n_cols)
+        keys = list()
+        if (row > 0):
+            keys.append(self._to_key(row-1, col, 1, 0))
+        if (col > 0):
+            keys.append(self._to_key(row, col-1, 0, 1))
+        if (col < self._n_cols - 1):
+            keys.append(self._to_key(row, col, 0, 1))
+        if (row < self._n_rows - 1):
+            keys.append(self._to_key(row, col, 1, 0))
+        return keys
+
+
+    def _to_key(self, row, col, d_row, d_col):
+        cluster = row * self._n_cols + col
+        return (cluster, cluster + d_row * self._n_cols + d_col)
+
+
+    def _to_cluster(self, idd):
+        row, col = divmod(idd, self._cols)
+        return (row // self.size) * self._n_cols + col // self.size
+
+
+    def _to_local(self, idd):
+        row, col = divmod(idd, self._cols)
+        return (row % self.size) * self.size + col % self.size
+
+
+    def _update_cost_min(self):
+        costs_valid = self._costs[self._valid]
+        if costs_valid.size:
+            self.cost_min = float(costs_valid.min())
+
+
+
+class AbstractPaths:
+    """
+    ===========================================================================
+     Description: Result of a Hierarchy Query (Paths refined lazily).
+    ---------------------------------------------------------------------------
+        The Cells of a Path are computed on the first get_path() of its
+         Goal and kept. Valid until the next update() of the Hierarchy.
+    ===========================================================================
+    """
+
+    def __init__(self, hierarchy, start, found, unreachable):
+        """
+        =======================================================================
+         Description: Init the Result of a Query.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. hierarchy : Hierarchy
+            2. start : int (Start Idd).
+            3. found : dict int:(float, list of int) (Cost and Abstract
+                                                       Path by Goal).
+            4. unreachable : list of int (Unreachable Goals).
+        =======================================================================
+        """
+        self.start = start
+        self.unreachable = list(unreachable)
+        self._hierarchy = hierarchy
+        self._found = found
+        self._paths = dict()
+
+
+    def get_cost(self, goal):
+        """
+        =======================================================================
+         Description: Return the Cost of the Path to the Goal (inf if the
+                       Goal is unreachable).
+        =======================================================================
+        """
+        return self._found.get(goal, (math.inf, None))[0]
+
+
+    def get_abstract_path(self, goal):
+        """
+        =======================================================================
+         Description: Return the Abstract Nodes of the Path to the Goal
+                       (None if the Goal is unreachable).
+        =======================================================================
+        """
+        return self._found.get(goal, (math.inf, None))[1]
+
+
+    def get_path(self, goal):
+        """
+        =======================================================================
+         Description: Return the Cells of the Path to the Goal (None if the
+                       Goal is unreachable).
+        =======================================================================
+        """
+        if goal not in self._found:
+            return None
+        if goal not in self._paths:
+            path = self._found[goal][1]
+            self._paths[goal] = self._hierarchy.refine(path)
+        return self._paths[goal]
+
+
+
+def _get_transitions(runs):
+    """
+    ===========================================================================
+     Description: Return the Transition Positions of the Runs of passable
+                   Border Cells.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. runs : 3D Numpy Array of bool (Border Row x Border Col x
+                                           Position along the Border).
+    ===========================================================================
+     Return: tuple of 3 Numpy Arrays of int (Border Row, Border Col,
+              Position), sorted by Border and Position.
+    ===========================================================================
+    """
+    padded = np.zeros(runs.shape[:2] + (runs.shape[2] + 2,), dtype=np.int8)
+    padded[..., 1:-1] = runs
+    diff = np.diff(padded, axis=2)
+    rows, cols, firsts = np.nonzero(diff == 1)
+    lasts = np.nonzero(diff == -1)[2] - 1
+    short = (lasts - firsts + 1) < ENTRANCE_LONG
+    mids = (firsts + lasts) // 2
+    rows = np.concatenate([rows[short], rows[~short], rows[~short]])
+    cols = np.concatenate([cols[short], cols[~short], cols[~short]])
+    positions = np.concatenate([mids[short], firsts[~short], lasts[~short]])
+    order = np.lexsort((positions, cols, rows))
+    return rows[order], cols[order], positions[order]
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+
+    def check(grid, octile, costs, size, n):
+        """Compare Hierarchy Queries with the exact KAStar Costs."""
+        graph = Graph(grid, octile=octile, costs=costs)
+        hierarchy = Hierarchy(grid, size, octile, costs)
+        idds = [int(x) for x in u_grid.get_valid_idds(grid)]
+        ok = True
+        for _ in range(n):
+            start = random.choice(idds)
+            goals = random.sample(idds, 3)
+            kastar = KAStar(grid, start, goals, graph=graph)
+            kastar.run()
+            for paths, goals_query in (
+                    (hierarchy.query(start, goals), goals),
+                    (hierarchy.query_astar(start, goals[0]), goals[:1])):
+                for goal in goals_query:
+                    cost_true = kastar.get_cost(goal)
+                    cost = paths.get_cost(goal)
+                    path = paths.get_path(goal)
+                    if (cost_true == math.inf):
+                        ok = ok and (cost == math.inf) and (path is None)
+                        continue
+                    ok = ok and (cost >= cost_true - 1e-9)
+                    ok = ok and (path[0] == start) and (path[-1] == goal)
+                    total = 0
+                    for idd_1, idd_2 in zip(path, path[1:]):
+                        neighbors, weights = graph.get_edges(idd_1)
+                        if idd_2 not in neighbors:
+                            return False
+                        total += weights[neighbors.index(idd_2)]
+                    ok = ok and math.isclose(total, cost)
+        return ok
+
+    def tester_query():
+        random.seed(7)
+        p1 = True
+        for i in range(4):
+            grid = u_grid.gen_obstacles_grid(30, 25)
+            p1 = p1 and check(grid, False, None, 8, 20)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_octile():
+        random.seed(8)
+        rnd = np.random.default_rng(8)
+        p1 = True
+        for i in range(3):
+            grid = u_grid.gen_obstacles_grid(27, 20)
+            costs = rnd.integers(1, 4, grid.shape).astype(float)
+            p1 = p1 and check(grid, True, costs, 7, 15)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_update():
+        random.seed(9)
+        rnd = np.random.default_rng(9)
+        p1 = p2 = True
+        for octile in (False, True):
+            grid = u_grid.gen_obstacles_grid(26, 20)
+            costs = rnd.integers(1, 4, grid.shape).astype(float)
+            hierarchy = Hierarchy(grid, 6, octile, costs)
+            for _ in range(10):
+                idds = random.sample(range(grid.size), 5)
+                for idd in idds:
+                    row, col = divmod(idd, grid.shape[1])
+                    grid[row, col] = -1 if (grid[row, col] >= 0) else idd
+                    costs[row, col] = random.randint(1, 3)
+                hierarchy.update(idds)
+                fresh = Hierarchy(grid, 6, octile, costs)
+                p1 = p1 and (hierarchy._borders == fresh._borders)
+                p1 = p1 and (hierarchy._entrances == fresh._entrances)
+                p1 = p1 and (hierarchy._edges.keys() == fresh._edges.keys())
+                for idd, edges in fresh._edges.items():
+                    edges_upd = hierarchy._edges[idd]
+                    p1 = p1 and (edges.keys() == edges_upd.keys())
+                    p1 = p1 and all(math.isclose(edges[x], edges_upd[x])
+                                    for x in edges)
+            p2 = p2 and check(grid, octile, costs, 6, 10)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_query()
+    tester_octile()
+    tester_update()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,477 @@
+import numpy as np
+
+from . import u_grid
+from .node import Node
+from .kastar import KAStar
+from .opened import OpenedHeap
+from .u_grid import DIRECTIONS, SQRT2
+
+
+class JPS(KAStar):
+    """
+    ===========================================================================
+     Description: Jump Point Search (multi-Goal) on uniform-cost Grids.
+    ---------------------------------------------------------------------------
+        KA* Search whose Successors are Jump Points: from each expanded
+         Node the Search jumps along the pruned Directions and pushes only
+         the Cells where the Path may turn (Forced Neighbors), so the many
+         symmetric Paths of the open Terrain never enter the Opened.
+        1. 4-connected or 8-connected (no Corner Cutting) by the Graph.
+        2. Jumps stop at every active Goal, so all the Goals are found with
+            their optimal Cost as in KA*.
+        3. With a Jump Table (build_table(), JPS+) the Jump Distances are
+            read from the Table instead of scanned Cell by Cell.
+        get_path() fills the Cells between the Jump Points, so the Paths
+         are the same Lists of Idds as of KA*.
+    ===========================================================================
+    """
+
+    def __init__(self, grid, start, goals, opened=OpenedHeap,
+                 incremental=False, graph=None, state=None, table=None,
+                 stats=None):
+        """
+        =======================================================================
+         Description: Init JPS.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start Idd).
+            3. goals : set of int (Goal Idd).
+            4. opened : class or Opened instance (as in KAStar).
+            5. incremental : bool (as in KAStar).
+            6. graph : Graph (4-connected or octile; Weights are ignored).
+            7. state : State (as in KAStar).
+            8. table : Numpy Array of int32 (Jump Table of the Graph from
+                                              build_table()) or None.
+            9. stats : Stats (as in KAStar, neighbors times the Jumps).
+        =======================================================================
+        """
+        if (graph is not None) and (graph.costs is not None):
+            raise ValueError('JPS needs a uniform-cost Graph (no Cell Costs)')
+        KAStar.__init__(self, grid, start, goals, opened, incremental, graph,
+                        state, stats=stats)
+        self._table = table
+        self._walkable = self._graph.get_padded()
+        self._cols = grid.shape[1]
+        self._width = self._cols + 2
+        self._directions = DIRECTIONS if self._graph.octile else DIRECTIONS[:4]
+        self._index = {d: i for i, d in enumerate(self._directions)}
+        if stats is not None:
+            stats.attach(self, [('neighbors', '_jump'),
+                                ('neighbors', '_jump_table')])
+
+
+    def add_goals(self, goals):
+        """
+        =======================================================================
+         Description: Add Goals and restart the Search (the Jumps done so
+                       far did not stop at the new Goals).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goals : iterable of int (Goal Idds).
+        =======================================================================
+        """
+        goals = list(self.goals) + [x for x in dict.fromkeys(goals)
+                                    if x not in self.goals]
+        JPS.__init__(self, self._grid, self.start, goals, self._opened,
+                     self._incremental, self._graph, self._state, self._table,
+                     self._stats)
+
+
+    def get_path(self, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal Idd).
+        =======================================================================
+         Return: List of Idds (None if the Goal was not reached).
+        =======================================================================
+        """
+        points = KAStar.get_path(self, goal)
+        if points is None:
+            return None
+        path = [points[0]]
+        for idd_1, idd_2 in zip(points, points[1:]):
+            row_1, col_1 = divmod(idd_1, self._cols)
+            row_2, col_2 = divmod(idd_2, self._cols)
+            step = (_sign(row_2 - row_1) * self._cols + _sign(col_2 - col_1))
+            steps = max(abs(row_2 - row_1), abs(col_2 - col_1))
+            path.extend(range(idd_1 + step, idd_2 + step, step)[:steps])
+        return path
+
+
+    def _expand(self):
+        """
+        ===================================================================
+         Description: Push the Jump Points of the Best Node.
+        ===================================================================
+        """
+        state = self._state
+        best = self._best.idd
+        g_best = state.g[best]
+        stats = self._stats
+        if stats is not None:
+            stats.expand(best)
+        p = self._to_padded(best)
+        goals = {self._to_padded(x) for x in self._goals_active}
+        for d_row, d_col in self._get_directions(best):
+            if self._table is None:
+                q = self._jump(p, d_row, d_col, goals)
+            else:
+                q = self._jump_table(p, d_row, d_col, goals)
+            if (q < 0):
+                continue
+            child = self._to_idd(q)
+            if state.is_closed(child):
+                continue
+            g_new = g_best + self._get_cost(p, q)
+            if state.get_g(child) <= g_new:
+                continue
+            node = self._nodes_opened.get(child)
+            if node is None:
+                node = Node(child)
+            else:
+                self._opened.remove(node)
+                if stats is not None:
+                    stats.reopened += 1
+            self._update_node(node,best,g_new)
+            self._push(node)
+
+
+    def _get_directions(self, idd):
+        """
+        ===================================================================
+         Description: Return the pruned Directions from the Node, by the
+                       Direction of the Jump that reached it.
+        ===================================================================
+        """
+        father = self._state.get_father(idd)
+        if (father == -1):
+            return self._directions
+        row, col = divmod(idd, self._cols)
+        row_father, col_father = divmod(father, self._cols)
+        d_row = _sign(row - row_father)
+        d_col = _sign(col - col_father)
+        if d_row and d_col:
+            return ((d_row,0), (0,d_col), (d_row,d_col))
+        if not self._graph.octile:
+            if d_col:
+                return ((0,d_col), (-1,0), (1,0))
+            return ((d_row,0), (0,-1), (0,1))
+        if d_col:
+            return ((0,d_col), (-1,d_col), (1,d_col), (-1,0), (1,0))
+        return ((d_row,0), (d_row,-1), (d_row,1), (0,-1), (0,1))
+
+
+    def _jump(self, p, d_row, d_col, goals):
+        """
+        ===================================================================
+         Description: Scan from p in the Direction and return the first
+                       Jump Point (padded Index, -1 if a Wall is hit).
+        ===================================================================
+        """
+        walkable = self._walkable
+        width = self._width
+        step = d_row * width + d_col
+        if d_row and d_col:
+            while True:
+                # No Corner Cutting
+                if not (walkable[p+d_col] and walkable[p+d_row*width]):
+                    return -1
+                p += step
+                if not walkable[p]:
+                    return -1
+                if p in goals:
+                    return p
+                if (self._jump(p, 0, d_col, goals) >= 0 or
+                        self._jump(p, d_row, 0, goals) >= 0):
+                    return p
+        side = width if d_col else 1
+        while True:
+            p += step
+            if not walkable[p]:
+                return -1
+            if p in goals:
+                return p
+            # Forced Neighbor: the Side is open but was blocked behind
+            if ((walkable[p-side] and not walkable[p-side-step]) or
+                    (walkable[p+side] and not walkable[p+side-step])):
+                return p
+            if d_row and not self._graph.octile:
+                if (self._jump(p, 0, 1, goals) >= 0 or
+                        self._jump(p, 0, -1, goals) >= 0):
+                    return p
+
+
+    def _jump_table(self, p, d_row, d_col, goals):
+        """
+        ===================================================================
+         Description: _jump() by the Jump Table (JPS+): the Table gives the
+                       Distance to the Jump Point (or to the Wall), and the
+                       Goals ahead in the Direction cut it shorter.
+        ===================================================================
+        """
+        width = self._width
+        dist = int(self._table[self._index[(d_row, d_col)], p])
+        steps = dist if (dist > 0) else -dist
+        best = dist if (dist > 0) else None
+        row, col = divmod(p, width)
+        for goal in goals:
+            row_goal, col_goal = divmod(goal, width)
+            ahead_row = (row_goal - row) * d_row
+            ahead_col = (col_goal - col) * d_col
+            if d_row and d_col:
+                # Goal in the Quadrant: stop where its Row or Col is met
+                if (ahead_row <= 0) or (ahead_col <= 0):
+                    continue
+                ahead = min(ahead_row, ahead_col)
+            elif d_col:
+                if (row_goal != row) or (ahead_col <= 0):
+                    continue
+                ahead = ahead_col
+            else:
+                # 4-connected Vertical Jumps scan the Rows sideways
+                if (ahead_row <= 0):
+                    continue
+                if self._graph.octile and (col_goal != col):
+                    continue
+                ahead = ahead_row
+            if (ahead <= steps) and ((best is None) or (ahead < best)):
+                best = ahead
+        if best is None:
+            return -1
+        return p + best * (d_row * width + d_col)
+
+
+    def _get_cost(self, p, q):
+        """
+        ===================================================================
+         Description: Return the Cost of the straight or diagonal Jump.
+        ===================================================================
+        """
+        d_row = abs(q // self._width - p // self._width)
+        d_col = abs(q % self._width - p % self._width)
+        if d_row and d_col:
+            return d_row * SQRT2
+        return d_row + d_col
+
+
+    def _to_padded(self, idd):
+        row, col = divmod(idd, self._cols)
+        return (row+1) * self._width + col + 1
+
+
+    def _to_idd(self, p):
+        row, col = divmod(p, self._width)
+        return (row-1) * self._cols + col - 1
+
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+def build_table(graph):
+    """
+    ===========================================================================
+     Description: Return the Jump Table (JPS+) of the Graph.
+    ---------------------------------------------------------------------------
+        table[i, p] for the Direction DIRECTIONS[i] and the padded Index p
+         (see Graph.get_padded()):
+            d > 0 : the Jump Point is d Steps away.
+            d <= 0 : no Jump Point, the Wall is after -d Steps.
+        Each Direction is one Sweep against it (the next Cell is done
+         before the Cell), vectorized over the Rows or Cols of the Sweep.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. graph : Graph (4-connected or octile, static Map).
+    ===========================================================================
+     Return: 2D Numpy Array of int32 (Directions x padded Cells).
+    ===========================================================================
+    """
+    rows, cols = graph.grid.shape
+    valid = np.zeros((rows+2, cols+2), dtype=bool)
+    valid[1:-1,1:-1] = graph.grid >= 0
+    directions = DIRECTIONS if graph.octile else DIRECTIONS[:4]
+    tables = np.zeros((len(directions), rows+2, cols+2), dtype=np.int32)
+    index = {d: i for i, d in enumerate(directions)}
+
+    def get_forced(d_row, d_col):
+        # Cells with a Forced Neighbor when reached by the straight Move
+        forced = np.zeros((rows+2, cols+2), dtype=bool)
+        for side in (-1, 1):
+            s_row, s_col = (side, 0) if d_col else (0, side)
+            open_side = valid[1+s_row:rows+1+s_row, 1+s_col:cols+1+s_col]
+            behind = valid[1+s_row-d_row:rows+1+s_row-d_row,
+                           1+s_col-d_col:cols+1+s_col-d_col]
+            forced[1:-1,1:-1] |= open_side & ~behind
+        return forced
+
+    def get_dist(is_next, is_jump, dist_next):
+        dist = np.where(dist_next > 0, dist_next + 1, dist_next - 1)
+        dist = np.where(is_jump, 1, dist)
+        return np.where(is_next, dist, 0).astype(np.int32)
+
+    # Horizontal before Vertical (4-connected Vertical Jumps use them)
+    for d_row, d_col in ((0,1), (0,-1), (-1,0), (1,0)):
+        table = tables[index[(d_row, d_col)]]
+        is_jump = get_forced(d_row, d_col)
+        if d_row and not graph.octile:
+            is_jump |= (tables[index[(0,1)]] > 0) | (tables[index[(0,-1)]] > 0)
+        if d_col:
+            for col in (range(cols, 0, -1) if d_col > 0 else range(1, cols+1)):
+                col_next = col + d_col
+                table[:,col] = get_dist(valid[:,col_next], is_jump[:,col_next],
+                                        table[:,col_next])
+        else:
+            for row in (range(rows, 0, -1) if d_row > 0 else range(1, rows+1)):
+                row_next = row + d_row
+                table[row] = get_dist(valid[row_next], is_jump[row_next],
+                                      table[row_next])
+    if graph.octile:
+        for d_row, d_col in DIRECTIONS[4:]:
+            table = tables[index[(d_row, d_col)]]
+            straight = ((tables[index[(d_row, 0)]] > 0) |
+                        (tables[index[(0, d_col)]] > 0))
+            cells = slice(1, cols+1)
+            cells_next = slice(1+d_col, cols+1+d_col)
+            for row in (range(rows, 0, -1) if d_row > 0 else range(1, rows+1)):
+                row_next = row + d_row
+                is_next = (valid[row_next, cells_next] & valid[row_next, cells]
+                           & valid[row, cells_next])
+                table[row, cells] = get_dist(is_next, straight[row_next, cells_next],
+                                             table[row_next, cells_next])
+    return tables.reshape(len(directions), -1)
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import math
+    import heapq
+    import random
+    from .graph import Graph
+
+    def dijkstra(graph, start):
+        dists = {start: 0}
+        heap = [(0, start)]
+        while heap:
+            dist, idd = heapq.heappop(heap)
+            if (dist > dists[idd]):
+                continue
+            for x, cost in zip(*graph.get_edges(idd)):
+                if (dist + cost < dists.get(x, float('inf'))):
+                    dists[x] = dist + cost
+                    heapq.heappush(heap, (dist + cost, x))
+        return dists
+
+    def is_valid_path(graph, path, start, goal):
+        if (path[0] != start) or (path[-1] != goal):
+            return False
+        for idd_1, idd_2 in zip(path, path[1:]):
+            if idd_2 not in graph.get_neighbors(idd_1):
+                return False
+        return True
+
+    def check(octile, with_table):
+        p1 = True
+        p2 = True
+        for i in range(30):
+            grid = u_grid.gen_obstacles_grid(random.randint(5,20),
+                                             random.choice([10,25,40]))
+            graph = Graph(grid, octile=octile)
+            table = build_table(graph) if with_table else None
+            idds_valid = u_grid.get_valid_idds(grid)
+            if (len(idds_valid) < 6):
+                continue
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:6]
+            dists = dijkstra(graph, start)
+            jps = JPS(grid,start,goals,graph=graph,table=table)
+            jps.run()
+            for goal in goals:
+                path = jps.get_path(goal)
+                if goal not in dists:
+                    p1 = p1 and path is None
+                    continue
+                if not math.isclose(jps.get_cost(goal), dists[goal]):
+                    p1 = False
+                if not is_valid_path(graph, path, start, goal):
+                    p2 = False
+        return p1 and p2
+
+    def tester_run():
+        p1 = check(False, False)
+        p2 = check(True, False)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_table():
+        grid = u_grid.serialize(np.array([[0,0,0,0],
+                                          [0,-1,0,0],
+                                          [0,0,0,0]]))
+        table = build_table(Graph(grid))
+        # RIGHT from (2,0): Jump Point (2,2) has the Forced Neighbor (1,2)
+        p1 = table[1, 3*6+1] == 2
+        # RIGHT from (0,2): no Jump Point, the Wall after 1 Step
+        p2 = table[1, 1*6+3] == -1
+        p3 = check(False, True) and check(True, True)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_expanded():
+        from .kastar import KAStar
+        grid = u_grid.gen_symmetric_grid(40)
+        graph = Graph(grid, octile=True)
+        start = 0
+        goals = [39*40+39, 39, 20*40+5]
+        kastar = KAStar(grid,start,goals,OpenedHeap,graph=graph)
+        kastar.run()
+        jps = JPS(grid,start,goals,graph=graph)
+        jps.run()
+        p1 = len(jps._closed) * 10 < len(kastar._closed)
+        p2 = all(math.isclose(jps.get_cost(x), kastar.get_cost(x)) for x in goals)
+        p3 = all(len(jps.get_path(x)) == len(kastar.get_path(x)) for x in goals)
+        jps.add_goals([40*20])
+        jps.run()
+        p4 = jps.get_cost(40*20) == 20
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_run()
+    tester_table()
+    tester_expanded()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
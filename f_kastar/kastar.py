@@ -0,0 +1,791 @@
+import math
+
+from . import u_grid
+from .node import Node
+from .opened import Opened
+from .heuristic import Heuristic
+from .graph import Graph
+from .state import State
+
+class KAStar:
+    def __init__(self, grid, start, goals, opened=Opened, incremental=False,
+                 graph=None, state=None, landmarks=None, stats=None,
+                 reverse=False):
+        """
+        ===================================================================
+         Description: KA* Algorithm.
+        ===================================================================
+         Arguments:
+        -------------------------------------------------------------------
+            1. grid : Grid.
+            2. start : int (Start Idd).
+            3. goals : set of int (Goal Idd).
+            4. opened : class (Opened Backend: Opened, OpenedHeap or
+                                OpenedBucket from the opened module) or
+                        Opened instance (cleared and reused).
+            5. incremental : bool (On Goal hit update only the Opened
+                                    Nodes that were nearest to this Goal).
+            6. graph : Graph (Compiled Grid, reused between Queries on the
+                               same Map; compiled here if None).
+            7. state : State (Arrays of G, Father and Closed marks by
+                               Idd, reset here in O(1); allocated here
+                               if None).
+            8. landmarks : Landmarks (ALT Tables of the Map, built on a
+                                       Graph of the same Connectivity,
+                                       tighten the Manhattan Heuristic)
+                           or None.
+            9. stats : Stats (Counters, Timers and Callbacks of the Search)
+                              or None (no Instrumentation).
+            10. reverse : bool (Search along the reverse Edges: the Cost
+                                 of a Goal is the Cost from the Goal to
+                                 the Start and get_path() runs backward).
+        -------------------------------------------------------------------
+            Goals in another Connected Component than the Start are
+             dropped up front and reported in the unreachable List.
+        -------------------------------------------------------------------
+            A Search built without graph and state compiles the Grid and
+             allocates O(Cells) Arrays for this one Query. Repeated Queries
+             on the same Map should go through SearchContext.query(), which
+             reuses them (and the Opened) between the Queries.
+        ===================================================================
+        """
+        self.start = start
+        self.goals = goals
+        self._grid = grid
+        self._graph = graph if graph is not None else Graph(grid)
+        self.unreachable = self._get_unreachable(goals)
+        self._goals_active = set(goals).difference(self.unreachable)
+        self._state = state if state is not None else State(grid.size)
+        self._state.reset()
+        self._incremental = incremental
+        self._nearest = dict()
+        self._nodes_of_goal = {goal: set() for goal in self._goals_active}
+        self._landmarks = landmarks
+        self._heuristic = Heuristic(grid, self._goals_active, landmarks,
+                                    self._graph.octile, self._graph.cost_min)
+        if reverse:
+            self._get_edges = self._graph.get_edges_reverse
+        else:
+            self._get_edges = self._graph.get_edges
+        self._stats = stats
+        if stats is not None:
+            stats.attach(self, [('pop', '_pop'), ('expand', '_expand'),
+                                ('neighbors', '_get_edges'),
+                                ('reprioritize', '_reprioritize')])
+            stats.attach(self._heuristic, [('heuristic', 'get'),
+                                           ('heuristic', 'get_many')])
+        
+        # Nodes are created only to carry Opened entries (by Idd)
+        self._nodes_opened = dict()
+        self._best = Node(start)
+        self._best.g = 0
+        self._best.f = 0
+        self._state.set(start, -1, 0)
+        
+        if isinstance(opened, type):
+            self._opened = opened()
+        else:
+            self._opened = opened
+            self._opened.clear()
+        self._push(self._best)
+        # Best Node was Closed but not Expanded (run() stopped on it)
+        self._pending = False
+
+
+    @property
+    def counter_heuristic(self):
+        """
+        =======================================================================
+         Description: Amount of (Node, Goal) Heuristic evaluations.
+        =======================================================================
+        """
+        return self._heuristic.counter
+
+
+    @property
+    def _closed(self):
+        """
+        =======================================================================
+         Description: Set of Closed Nodes (built from the State O(Cells)).
+        =======================================================================
+        """
+        return {Node(idd) for idd in self._state.get_closed()}
+
+    
+    def run(self):
+        """
+        =======================================================================
+         Description: Run A* Algorithm (resumes after add_goals()).
+        =======================================================================
+        """
+        for goal in self._iter_goals():
+            pass
+
+
+    def iter_results(self, k=None):
+        """
+        =======================================================================
+         Description: Run A* Algorithm and yield each Goal when it is Closed.
+        -----------------------------------------------------------------------
+            1. Goals are yielded in the Order of their Cost (nearest first).
+            2. The Search stops after k Goals (all the Goals if k is None)
+                and can be resumed later by run() or iter_results().
+            3. Unreachable Goals are not yielded.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. k : int (Max Amount of Goals to yield).
+        =======================================================================
+         Return: Generator of tuple (goal, cost, path) : (int, float,
+                  list of int).
+        =======================================================================
+        """
+        if (k is not None) and (k <= 0):
+            return
+        for i, goal in enumerate(self._iter_goals()):
+            yield goal, self.get_cost(goal), self.get_path(goal)
+            if (k is not None) and (i+1 >= k):
+                return
+
+
+    def _iter_goals(self):
+        """
+        =======================================================================
+         Description: A* Loop, yield each Goal Idd when it is Closed.
+        -----------------------------------------------------------------------
+            The yielded Goal is Closed but not Expanded (_pending), so the
+             Loop can be left at any yield and resumed by a new Generator.
+        =======================================================================
+        """
+        if self._pending:
+            self._pending = False
+            if not self._goals_active:
+                self._pending = True
+                return
+            self._expand()
+        while (True):
+            if (self._opened.is_empty()):
+                self._best = None                
+                return
+            self._best = self._pop()
+            self._state.close(self._best.idd)
+            if (self._best.idd in self._goals_active):
+                if self._stats is not None:
+                    self._stats.goal(self._best.idd, self._best.g)
+                self._goals_active.remove(self._best.idd)
+                self._heuristic.remove(self._best.idd)
+                if self._goals_active:
+                    self._reprioritize(self._best.idd)
+                self._pending = True
+                yield self._best.idd
+                self._pending = False
+
+            if not self._goals_active:
+                self._pending = True
+                return
+            self._expand()    
+
+
+    def add_goals(self, goals):
+        """
+        =======================================================================
+         Description: Add Goals to a (finished) Search, call run() to resume.
+        -----------------------------------------------------------------------
+            1. Goals that are already Closed are answered by get_path()
+                and the unreachable Goals are only reported.
+            2. H of the Opened Nodes is lowered to the nearest new Goal
+                (the other Goals are unchanged, so only the new are checked).
+            3. run() continues the Expansion from the current Opened.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goals : iterable of int (Goal Idds).
+        =======================================================================
+        """
+        goals = [x for x in dict.fromkeys(goals) if x not in self.goals]
+        if isinstance(self.goals, set):
+            self.goals = self.goals | set(goals)
+        else:
+            self.goals = list(self.goals) + goals
+        goals = [x for x in goals if not self._state.is_closed(x)]
+        unreachable = self._get_unreachable(goals)
+        self.unreachable.extend(unreachable)
+        goals = [x for x in goals if x not in unreachable]
+        if not goals:
+            return
+        # Without active Goals the H of the Opened Nodes is out of date
+        is_stale = not self._goals_active
+        self._goals_active.update(goals)
+        for goal in goals:
+            self._nodes_of_goal[goal] = set()
+        self._heuristic.add(goals)
+        nodes = list(self._opened)
+        if is_stale:
+            self._update_nodes(nodes)
+            self._opened.refresh()
+            return
+        heuristic = Heuristic(self._grid, goals, self._landmarks,
+                              self._graph.octile, self._graph.cost_min)
+        hs, nearests = heuristic.get_many([node.idd for node in nodes])
+        self._heuristic.counter += heuristic.counter
+        changed = list()
+        for node, h, nearest in zip(nodes, hs, nearests):
+            if (h >= node.h):
+                continue
+            node.h = h
+            node.f = node.g + h
+            if self._incremental:
+                self._nearest[node.idd] = nearest
+                self._nodes_of_goal[nearest].add(node.idd)
+            changed.append(node)
+        self._opened.update(changed)
+            
+            
+    def get_path(self, goal):
+        """
+        =======================================================================
+         Description: Return Optimal Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal Idd).
+        -----------------------------------------------------------------------
+            Only a Closed Goal has an optimal Path: a Goal that is still in
+             the Opened (the Search stopped early by iter_results(k)) is
+             answered as not reached.
+        =======================================================================
+         Return: List of Idds (None if the Goal was not reached).
+        =======================================================================
+        """
+        if not self._state.is_closed(goal):
+            return None
+        idd = goal
+        path = [idd]
+        while (idd != self.start):
+            idd = self._state.father[idd]
+            path.append(idd)
+        path.reverse()        
+        return path
+
+
+    def get_cost(self, goal):
+        """
+        =======================================================================
+         Description: Return the Cost of the Path from Start to Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Goal Idd).
+        =======================================================================
+         Return: float (inf if the Goal was not reached or not Closed).
+        =======================================================================
+        """
+        if not self._state.is_closed(goal):
+            return math.inf
+        return self._state.get_g(goal)
+    
+    
+    def get_must_expanded_nodes(self):
+        """
+        =======================================================================
+         Description: Return Amount of Nodes on the Optimal Paths to the
+                       Goals (unreachable Goals have no Path and are skipped).
+        =======================================================================
+        """
+        nodes = set()
+        for goal in self.goals:
+            path = self.get_path(goal)
+            if path is None:
+                continue
+            nodes.update(path)
+        return len(nodes)
+    
+       
+    def _get_unreachable(self, goals):
+        """
+        =======================================================================
+         Description: Return List of Goals that can not be reached from the
+                       Start (another Connected Component, O(Goals)).
+        =======================================================================
+        """
+        components = self._graph.get_components()
+        component = components[self.start]
+        return [goal for goal in goals if components[goal] != component]
+
+
+    def _expand(self):   
+        """
+        ===================================================================
+         Description: Expand the Best Node's Children.
+        ===================================================================
+        """
+        state = self._state
+        best = self._best.idd
+        g_best = state.g[best]
+        stats = self._stats
+        if stats is not None:
+            stats.expand(best)
+        for child, cost in zip(*self._get_edges(best)):
+            if state.is_closed(child):
+                continue
+            g_new = g_best + cost
+            if state.get_g(child) <= g_new:
+                continue
+            node = self._nodes_opened.get(child)
+            if node is None:
+                node = Node(child)
+            else:
+                self._opened.remove(node)
+                if stats is not None:
+                    stats.reopened += 1
+            self._update_node(node,best,g_new)
+            self._push(node)
+
+
+    def _push(self, node):
+        """
+        ===================================================================
+         Description: Push the Node into the Opened.
+        ===================================================================
+        """
+        self._nodes_opened[node.idd] = node
+        self._opened.push(node)
+        if self._stats is not None:
+            self._stats.push(len(self._opened))
+
+
+    def _pop(self):
+        """
+        ===================================================================
+         Description: Pop the Best Node from the Opened.
+        ===================================================================
+        """
+        node = self._opened.pop()
+        del self._nodes_opened[node.idd]
+        if self._stats is not None:
+            self._stats.popped += 1
+        return node
+
+
+    def _reprioritize(self, goal):
+        """
+        =======================================================================
+         Description: Update the Opened Nodes after the Goal was reached.
+        -----------------------------------------------------------------------
+            1. Full mode: update all the Opened Nodes and refresh the Opened.
+            2. Incremental mode: update only the Opened Nodes whose nearest
+                Goal was the reached Goal and re-order them in bulk.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. goal : int (Idd of the reached Goal).
+        =======================================================================
+        """
+        if not self._incremental:
+            nodes = list(self._opened)
+            self._update_nodes(nodes)
+            self._opened.refresh()
+            return
+        nodes = list()
+        for idd in self._nodes_of_goal.pop(goal, set()):
+            if (self._nearest.get(idd) != goal):
+                continue
+            node = self._nodes_opened.get(idd)
+            if node is None:
+                continue
+            nodes.append(node)
+        self._update_nodes(nodes)
+        self._opened.update(nodes)
+
+
+    def _update_node(self, node, father, g):
+        """
+        =======================================================================
+         Description: Update Node.
+        =======================================================================
+         Attributes:
+        -----------------------------------------------------------------------
+            1. node : Node (node to update)
+            2. father : int (Father's Idd)
+            3. g : int
+        =======================================================================
+        """
+        h, nearest = self._heuristic.get(node.idd)
+        node.g = g
+        node.h = h
+        node.f = g + h
+        self._state.set(node.idd, father, g)
+        if self._incremental and (nearest is not None):
+            self._nearest[node.idd] = nearest
+            self._nodes_of_goal[nearest].add(node.idd)
+
+
+    def _update_nodes(self, nodes):
+        """
+        =======================================================================
+         Description: Update H and F of the Nodes (G and Father are kept)
+                       by one vectorized Heuristic call.
+        =======================================================================
+         Attributes:
+        -----------------------------------------------------------------------
+            1. nodes : list of Node
+        =======================================================================
+        """
+        hs, goals = self._heuristic.get_many([node.idd for node in nodes])
+        for node, h, nearest in zip(nodes, hs, goals):
+            node.h = h
+            node.f = node.g + h
+            if self._incremental and (nearest is not None):
+                self._nearest[node.idd] = nearest
+                self._nodes_of_goal[nearest].add(node.idd)
+
+    
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+    
+    import sys
+    import random
+    from . import u_random
+    
+    def tester_run():         
+        grid = u_grid.gen_symmetric_grid(4)        
+        start = 0
+        goal = 12
+        astar = KAStar(grid,start,{goal})
+        astar.run()        
+        closed_true = {Node(0),Node(4),Node(8),Node(12)}
+        p1 = closed_true == astar._closed
+        
+        grid = u_grid.gen_symmetric_grid(4)        
+        start = 0
+        goals = {7,12}
+        astar = KAStar(grid,start,goals)
+        astar.run()        
+        closed_true = {Node(0),Node(4),Node(8),Node(12),Node(5),Node(6),Node(7)}
+        p2 = closed_true == astar._closed        
+              
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):        
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))  
+            
+    def tester_get_path():
+        grid = u_grid.gen_symmetric_grid(4)
+        start = 0
+        goal = 12
+        astar = KAStar(grid,start,{goal})
+        astar.run()
+        optimal_path = [0,4,8,12]
+        p1 = astar.get_path(goal) == optimal_path
+        
+        grid = u_grid.gen_symmetric_grid(4)
+        grid[1][1] = -1
+        grid[2][1] = -1
+        start = 8
+        goal = 10
+        astar = KAStar(grid,start,{goal})
+        astar.run()
+        optimal_path = [8,12,13,14,10]
+        p2 = astar.get_path(goal) == optimal_path
+        
+        p3 = True
+        for i in range(1000):
+            n = u_random.get_random_int(4,4)
+            grid = u_grid.gen_symmetric_grid(n)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:3]
+            kastar = KAStar(grid,start,goals)
+            kastar.run()
+            for goal in goals:
+                len_optimal = u_grid.manhattan_distance(grid,start,goal)+1
+                if len(kastar.get_path(goal)) != len_optimal:
+                    p3 = False
+                    print('start={0}'.format(start))
+                    print('goal={0}'.format(goals))
+                    print('grid:')
+                    for row in range(grid.shape[0]):
+                        li = list()
+                        for col in range(grid.shape[1]):
+                            li.append(grid[row][col])
+                        li = [str(x) for x in li]
+                        print(','.join(li))
+                    print('goal[{0}]: {1}'.format(goal,kastar.get_path(goal)))            
+        
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):        
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))  
+    
+    def tester_opened():
+        from .opened import OpenedHeap, OpenedBucket
+        p1 = True
+        for i in range(100):
+            n = u_random.get_random_int(4,8)
+            grid = u_grid.gen_symmetric_grid(n)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:4]
+            for opened in (OpenedHeap, OpenedBucket):
+                kastar = KAStar(grid,start,goals,opened)
+                kastar.run()
+                for goal in goals:
+                    len_optimal = u_grid.manhattan_distance(grid,start,goal)+1
+                    if len(kastar.get_path(goal)) != len_optimal:
+                        p1 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
+    def tester_incremental():
+        from .opened import OpenedHeap
+        p1 = True
+        counter_full = 0
+        counter = 0
+        for i in range(100):
+            grid = u_grid.gen_obstacles_grid(8,20)
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:6]
+            kastar_full = KAStar(grid,start,goals,OpenedHeap)
+            kastar_full.run()
+            kastar = KAStar(grid,start,goals,OpenedHeap,incremental=True)
+            kastar.run()
+            for goal in goals:
+                if (kastar.get_cost(goal) != kastar_full.get_cost(goal)):
+                    p1 = False
+            # ties may expand other Nodes, so compare the totals
+            counter_full += kastar_full.counter_heuristic
+            counter += kastar.counter_heuristic
+        p2 = counter < counter_full
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
+    def tester_state():
+        from .state import State
+        grid = u_grid.gen_obstacles_grid(10,20)
+        state = State(grid.size)
+        p1 = True
+        for i in range(50):
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:4]
+            kastar_fresh = KAStar(grid,start,goals)
+            kastar_fresh.run()
+            kastar = KAStar(grid,start,goals,state=state)
+            kastar.run()
+            if (kastar._closed != kastar_fresh._closed):
+                p1 = False
+            for goal in goals:
+                if (kastar.get_path(goal) != kastar_fresh.get_path(goal)):
+                    p1 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_add_goals():
+        from .opened import OpenedHeap
+        grid = u_grid.gen_obstacles_grid(12,20)
+        p1 = True
+        for i in range(50):
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:7]
+            kastar_fresh = KAStar(grid,start,goals,OpenedHeap)
+            kastar_fresh.run()
+            kastar = KAStar(grid,start,goals[:2],OpenedHeap,i % 2 == 0)
+            kastar.run()
+            kastar.add_goals(goals[2:4])
+            kastar.run()
+            kastar.add_goals(goals[3:])
+            kastar.run()
+            kastar.run()
+            if (sorted(kastar.goals) != sorted(goals)):
+                p1 = False
+            for goal in goals:
+                if (kastar.get_cost(goal) != kastar_fresh.get_cost(goal)):
+                    p1 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_iter_results():
+        grid = u_grid.gen_obstacles_grid(12,20)
+        p1 = True
+        p2 = True
+        p3 = True
+        opened_goals = 0
+        for i in range(50):
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:7]
+            kastar_fresh = KAStar(grid,start,goals)
+            kastar_fresh.run()
+            kastar = KAStar(grid,start,goals)
+            results = list(kastar.iter_results(k=2))
+            costs = [cost for goal, cost, path in results]
+            if (len(results) > 2) or (costs != sorted(costs)):
+                p1 = False
+            # Goals reached (finite G) but not Closed by the early Stop
+            done = {goal for goal, cost, path in results}
+            for goal in set(goals) - done:
+                if (kastar._state.get_g(goal) < math.inf):
+                    opened_goals += 1
+                if (kastar.get_path(goal) is not None):
+                    p3 = False
+                if (kastar.get_cost(goal) != math.inf):
+                    p3 = False
+            results += list(kastar.iter_results())
+            for goal, cost, path in results:
+                if (cost != kastar_fresh.get_cost(goal)):
+                    p1 = False
+                if (path != kastar.get_path(goal)):
+                    p1 = False
+            reached = [x for x in goals if kastar_fresh.get_path(x) is not None]
+            if (sorted(goal for goal, cost, path in results) != sorted(reached)):
+                p2 = False
+        p3 = p3 and (opened_goals > 0)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_unreachable():
+        import numpy as np
+        # Left Half and Right Half are split by a Wall
+        grid = np.zeros((6,9), dtype=int)
+        grid[:,4] = -1
+        grid = u_grid.serialize(grid)
+        kastar = KAStar(grid,0,[8,17,20,44])
+        kastar.run()
+        p1 = kastar.unreachable == [8,17,44]
+        p2 = kastar.get_path(20) is not None and kastar.get_path(8) is None
+        p3 = len(kastar._closed) < 24
+        kastar = KAStar(grid,0,[8,17])
+        kastar.run()
+        p4 = len(kastar._closed) == 1
+        kastar.add_goals([26,2])
+        kastar.run()
+        p5 = kastar.unreachable == [8,17,26] and kastar.get_cost(2) == 2
+        p5 = p5 and (kastar.get_must_expanded_nodes() == 3)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_costs():
+        import heapq
+        import math
+        from .opened import OpenedHeap
+        from .astar_original import AStar
+        grid = u_grid.gen_obstacles_grid(12,25)
+        graph = Graph(grid, octile=True)
+        graph_weighted = Graph(grid, costs=u_grid.dict_to_costs(
+            grid, u_grid.gen_dict_weights(grid.size)))
+        
+        def dijkstra(start):
+            dists = {start: 0}
+            heap = [(0, start)]
+            while heap:
+                dist, idd = heapq.heappop(heap)
+                if (dist > dists[idd]):
+                    continue
+                for x, cost in zip(*graph.get_edges(idd)):
+                    if (dist + cost < dists.get(x, float('inf'))):
+                        dists[x] = dist + cost
+                        heapq.heappush(heap, (dist + cost, x))
+            return dists
+        
+        p1 = True
+        p2 = True
+        for i in range(40):
+            if (i == 20):
+                graph = graph_weighted
+            idds_valid = u_grid.get_valid_idds(grid)
+            random.shuffle(idds_valid)
+            start = idds_valid[0]
+            goals = idds_valid[1:5]
+            dists = dijkstra(start)
+            kastar = KAStar(grid,start,goals,OpenedHeap,True,graph)
+            kastar.run()
+            for goal in goals:
+                astar = AStar(grid,start,goal,OpenedHeap,graph)
+                astar.run()
+                if goal not in dists:
+                    p1 = p1 and kastar.get_path(goal) is None
+                    continue
+                if not math.isclose(kastar.get_cost(goal), dists[goal]):
+                    p1 = False
+                if not math.isclose(astar.best.g, dists[goal]):
+                    p1 = False
+                path = kastar.get_path(goal)
+                for idd_1, idd_2 in zip(path, path[1:]):
+                    if idd_2 not in graph.get_neighbors(idd_1):
+                        p2 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
+    print('\n====================\nStart Tester\n====================')    
+    tester_run()
+    tester_get_path()
+    tester_opened()
+    tester_incremental()
+    tester_state()
+    tester_add_goals()
+    tester_iter_results()
+    tester_unreachable()
+    tester_costs()
+    print('====================\nEnd Tester\n====================')        
+    
+    
+#tester()
+  
+
+"""
+grid = u_grid.gen_symmetric_grid(10)
+start = 40
+goals = [48,34]
+kastar = KAStar(grid, start, goals)
+kastar.run()
+print(kastar.get_path(48))
+"""
+
@@ -0,0 +1,262 @@
+import numpy as np
+
+
+class Landmarks:
+    """
+    ===========================================================================
+     Description: Landmark (ALT) Tables of one Map.
+    ---------------------------------------------------------------------------
+        dists[i] holds the exact Distance from the i-th Landmark to every
+         Idd (-1 if unreachable) as int32. By the Triangle Inequality
+         |d(L,n) - d(L,goal)| <= d(n,goal) for every Landmark L, so the
+         maximum over the Landmarks is an admissible Heuristic that knows
+         about the Walls (unlike the Manhattan Distance).
+        The Distances are Hop Counts of the Graph the Tables were built
+         on. On that Graph with Costs >= 1 (ex: octile) they still give
+         admissible (if weaker) Bounds, and on weighted Terrain after the
+         Scale by the minimum Cell Cost. Hop Counts of the 4-connected
+         Graph overestimate on the octile Graph (a Diagonal is one Move),
+         so the Tables record their Connectivity (see check_octile()).
+    ===========================================================================
+    """
+
+    def __init__(self, idds, dists, octile=False):
+        """
+        =======================================================================
+         Description: Init Landmarks with computed Tables.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idds : Numpy Array of int (Landmark Idds).
+            2. dists : 2D Numpy Array of int32 (Landmark x Idd Distances).
+            3. octile : bool (Tables of the 8-connected Graph).
+        =======================================================================
+        """
+        self.idds = idds
+        self.dists = dists
+        self.octile = bool(octile)
+
+
+    def get(self, idd, goal):
+        """
+        =======================================================================
+         Description: Return the Landmark Lower Bound of the Distance from
+                       the Node to the Goal.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+            2. goal : int (Goal Idd).
+        =======================================================================
+         Return: int
+        =======================================================================
+        """
+        return int(get_bounds(self.dists[:, idd], self.dists[:, goal]).max(initial=0))
+
+
+    def __len__(self):
+        return len(self.idds)
+
+
+
+def check_octile(landmarks, octile):
+    """
+    ===========================================================================
+     Description: Raise ValueError if the Landmarks were built on a Graph of
+                   another Connectivity than the searched Graph.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. landmarks : Landmarks or None.
+        2. octile : bool (Connectivity of the searched Graph).
+    ===========================================================================
+    """
+    if (landmarks is None) or (landmarks.octile == bool(octile)):
+        return
+    raise ValueError('Landmarks were built on a {0}-connected Graph, the '
+                     'searched Graph is {1}-connected'
+                     .format(8 if landmarks.octile else 4, 8 if octile else 4))
+
+
+def get_bounds(dists_1, dists_2):
+    """
+    ===========================================================================
+     Description: Return |dists_1 - dists_2| (0 where any is unreachable).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. dists_1 : Numpy Array of int32 (Landmark Distances).
+        2. dists_2 : Numpy Array of int32 (broadcastable to dists_1).
+    ===========================================================================
+     Return: Numpy Array of int32 (Lower Bounds per Landmark).
+    ===========================================================================
+    """
+    bounds = np.abs(dists_1 - dists_2)
+    bounds[(dists_1 < 0) | (dists_2 < 0)] = 0
+    return bounds
+
+
+def get_distances(graph, source):
+    """
+    ===========================================================================
+     Description: Return the Distances from the Source to every Idd.
+    ---------------------------------------------------------------------------
+        Breadth-First Search by whole Frontiers: the Neighbors of all the
+         Frontier Idds are gathered from the CSR Arrays in one Numpy call.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. graph : Graph (Costs are ignored: Hop Counts).
+        2. source : int (Source Idd).
+    ===========================================================================
+     Return: Numpy Array of int32 (-1 if unreachable).
+    ===========================================================================
+    """
+    indptr = np.asarray(graph.indptr)
+    indices = np.asarray(graph.indices)
+    dists = np.full(len(graph), -1, dtype=np.int32)
+    dists[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    dist = 0
+    while frontier.size:
+        dist += 1
+        firsts = indptr[frontier]
+        counts = indptr[frontier+1] - firsts
+        total = int(counts.sum())
+        if not total:
+            break
+        # Position of each gathered Neighbor in indices
+        shifts = np.repeat(firsts - (np.cumsum(counts) - counts), counts)
+        neighbors = indices[shifts + np.arange(total)]
+        neighbors = np.unique(neighbors[dists[neighbors] < 0])
+        dists[neighbors] = dist
+        frontier = neighbors
+    return dists
+
+
+def select(graph, n, seed=0):
+    """
+    ===========================================================================
+     Description: Select n Landmarks by Farthest-Point Selection.
+    ---------------------------------------------------------------------------
+        1. Start from a random Idd of the largest Connected Component.
+        2. The first Landmark is the farthest Idd from it.
+        3. Each next Landmark is the Idd with the largest Distance to its
+            nearest chosen Landmark (Idds out of reach are skipped).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. graph : Graph
+        2. n : int (Amount of Landmarks).
+        3. seed : int
+    ===========================================================================
+     Return: Landmarks
+    ===========================================================================
+    """
+    idds_valid = graph.get_valid_idds()
+    components = graph.get_components()
+    largest = np.bincount(components[idds_valid]).argmax()
+    idds_largest = idds_valid[components[idds_valid] == largest]
+    rnd = np.random.default_rng(seed)
+    dists = get_distances(graph, int(rnd.choice(idds_largest)))
+    idds = list()
+    tables = list()
+    nearest = dists
+    for i in range(min(n, len(idds_largest))):
+        idd = int(nearest.argmax())
+        if (nearest[idd] <= 0) and idds:
+            break
+        dists = get_distances(graph, idd)
+        idds.append(idd)
+        tables.append(dists)
+        if not i:
+            nearest = dists.copy()
+        else:
+            np.minimum(nearest, dists, out=nearest, where=dists >= 0)
+    return Landmarks(np.array(idds, dtype=np.int64),
+                     np.array(tables, dtype=np.int32), graph.octile)
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+    from .graph import Graph
+
+    def tester_get_distances():
+        grid = u_grid.serialize(np.array([[0,0,0,0],
+                                          [0,-1,-1,0],
+                                          [0,0,-1,-1]]))
+        dists = get_distances(Graph(grid), 8)
+        dists_true = [2,3,4,5,1,-1,-1,6,0,1,-1,-1]
+        p1 = dists.tolist() == dists_true
+        p2 = dists.dtype == np.int32
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_select():
+        grid = u_grid.gen_symmetric_grid(10)
+        landmarks = select(Graph(grid), 4)
+        corners = {0, 9, 90, 99}
+        p1 = set(landmarks.idds[:3].tolist()) <= corners
+        p2 = landmarks.dists.shape == (4, 100)
+        p3 = not landmarks.octile and select(Graph(grid, octile=True), 2).octile
+        check_octile(landmarks, False)
+        try:
+            check_octile(landmarks, True)
+            p3 = False
+        except ValueError:
+            pass
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_get():
+        p1 = True
+        p2 = True
+        for i in range(20):
+            grid = u_grid.gen_obstacles_grid(15,30)
+            graph = Graph(grid)
+            landmarks = select(graph, 4, seed=i)
+            idds_valid = graph.get_valid_idds().tolist()
+            goal = random.choice(idds_valid)
+            dists = get_distances(graph, goal)
+            for idd in idds_valid:
+                h = landmarks.get(idd, goal)
+                if (dists[idd] >= 0) and (h > dists[idd]):
+                    p1 = False
+                if (dists[idd] < 0) and (h < 0):
+                    p2 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_get_distances()
+    tester_select()
+    tester_get()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -1,4 +1,16 @@
 class Node:
+    """
+    ===========================================================================
+     Description: Search Node (compact, with precomputed Sort Key).
+    ---------------------------------------------------------------------------
+        1. __slots__ instead of __dict__ (less Memory per Node).
+        2. key = (f, -g, idd) is refreshed when F or G is set, so all the
+            Comparisons are one Tuple comparison: lower F first, then
+            higher G, then lower Idd (deterministic on full ties).
+    ===========================================================================
+    """
+
+    __slots__ = ('idd', 'w', 'father', 'h', '_g', '_f', 'key')
     
     def __init__(self, idd):
         """
@@ -13,15 +25,38 @@ class Node:
         self.idd = idd
         self.w = 1  
         self.father = None  
-        self.g = float('Infinity')
         self.h = float('Infinity')
-        self.f = float('Infinity')
+        self._g = float('Infinity')
+        self._f = float('Infinity')
+        self.key = (self._f, -self._g, idd)
+
+
+    @property
+    def g(self):
+        return self._g
+
+
+    @g.setter
+    def g(self, g):
+        self._g = g
+        self.key = (self._f, -g, self.idd)
+
+
+    @property
+    def f(self):
+        return self._f
+
+
+    @f.setter
+    def f(self, f):
+        self._f = f
+        self.key = (f, -self._g, self.idd)
         
     
     def __eq__(self, other):
         """
         =======================================================================
-         Description: Return True if Self equals to Other.
+         Description: Return True if Self equals to Other (by Idd).
         =======================================================================
          Arguments:
         -----------------------------------------------------------------------
@@ -30,8 +65,7 @@ class Node:
          Return: bool (True if Self equals to Other).
         =======================================================================
         """
-        if self.idd == other.idd:
-            return True
+        return self.idd == other.idd
     
     
     def __ne__(self, other):
@@ -46,7 +80,7 @@ class Node:
          Return: bool (True if Self not equals to Other).
         =======================================================================
         """
-        return not self.__eq__(other)
+        return self.idd != other.idd
     
     
     def __lt__(self, other):
@@ -61,16 +95,11 @@ class Node:
          Return: bool (True if Self is less than Other).
         =======================================================================
         """
-        if (self.f < other.f):
-            return True
-        if (self.f == other.f):
-            if (self.g >= other.g):
-                return True
-        return False
+        return self.key < other.key
     
     
     def __le__(self, other):
-        return self == other or self < other
+        return self.key <= other.key
     
     
     def __gt__(self, other):
@@ -85,11 +114,11 @@ class Node:
          Return: bool (True if Self is greater than Other).
         =======================================================================
         """
-        return not (self < other) and not (self == other)
+        return self.key > other.key
     
     
     def __ge__(self, other):
-        return self == other or self > other
+        return self.key >= other.key
     
     
     def __str__(self):
@@ -142,8 +171,32 @@ def tester():
         else:
             print('Failed: {0}'.format(fname))            
     
+    def tester_key():
+        # full tie on f and g is broken by idd
+        node_1 = Node(1)
+        node_2 = Node(2)
+        p1 = (node_1 < node_2) and not (node_2 < node_1)
+
+        # key is refreshed when f or g is set
+        node_2.g = 3
+        node_2.f = 4
+        p2 = node_2.key == (4,-3,2)
+
+        # mismatch is False (not None)
+        p3 = (node_1 == node_2) is False
+
+        # no __dict__
+        p4 = not hasattr(node_1, '__dict__')
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+    
     print('\n====================\nStart Tester\n====================')    
     tester_comparision()
+    tester_key()
     print('====================\nEnd Tester\n====================')        
     
     
@@ -0,0 +1,515 @@
+#=====================================================================
+# Opened special Set for AStar
+#=====================================================================
+# Methods:
+#---------------------------------------------------------------------
+#   1. push(node)
+#       Push Node into the Opened Set O(1).
+#   2. pop()
+#       Return the Best Node and Remove it from the Opened Set O(n).
+#   3. is_empty()
+#       Return True if the Opened Set is empty.
+#   4. contains(node)
+#       Return True if Opened Set contains Node.
+#   5. remove(node)
+#       Remove the Node from the Opened Set O(n).
+#   6. refresh()
+#       Restore the Order after Nodes were updated in place O(n).
+#   7. update(nodes)
+#       Restore the Order after the given Nodes were updated in place.
+#   8. clear()
+#       Remove all the Nodes (the Opened is reused by the next Search).
+#=====================================================================
+# Backends (same Methods, chosen by the Search at construction time):
+#---------------------------------------------------------------------
+#   1. Opened : Set with linear scan for the Best Node.
+#   2. OpenedHeap : Binary Heap with lazy deletion O(log n).
+#   3. OpenedBucket : Buckets by integer F (unit-cost Grids).
+#=====================================================================
+# Edited: 11/09/2018
+#=====================================================================
+import heapq
+
+
+class Opened:
+    
+
+    #=================================================================
+    # Constructor
+    #=================================================================
+    # Edited: 02/09/2018
+    #=================================================================
+    def __init__(self):
+        self._opened = set()
+        self._best = None
+        
+    
+    #=================================================================
+    # Push Node into the Opened Set
+    #=================================================================
+    # Complexity: O(1)
+    #=================================================================
+    # Edited: 10/09/2018
+    #=================================================================
+    def push(self, node):        
+        self._opened.add(node)        
+        self._update_best(node)                    
+    
+    
+    #=================================================================
+    # 1. Return the Best Node
+    # 2. Remove it from the Opened Set
+    #=================================================================
+    # Complexity: O(n)
+    #=================================================================
+    # Edited: 02/09/2018
+    #=================================================================
+    def pop(self):        
+        temp = self._best
+        
+        # Remove the Best Node from the Opened set
+        #   and set the Best Node to be None
+        if self._best is not None:
+            self._opened.remove(self._best)
+            self._best = None
+            
+        # Set the Best Node to be the minimum Node in the Opened
+        for node in self._opened:
+            self._update_best(node)
+            
+        return temp
+    
+    
+    def remove(self, node):
+        self._opened.remove(node)
+        for node in self._opened:
+            self._update_best(node)
+    
+    
+    def contains(self,node):
+        """
+        ===================================================================
+         Description: Return True if Opened Set contains the Node
+        ===================================================================
+         Arguments: node : Node (to check if exists in the Opened Set)
+        ===================================================================
+        """
+        return node in self._opened
+    
+    
+    #=================================================================
+    # Return True if the Opened Set is empty
+    #=================================================================
+    # Edited: 01/09/2018
+    #=================================================================
+    def is_empty(self):
+        return (len(self._opened) == 0)
+
+
+    def refresh(self):
+        """
+        ===================================================================
+         Description: Restore the Best Node after Nodes were updated
+                       in place (F or G changed while in the Opened).
+        ===================================================================
+        """
+        self._best = None
+        for node in self._opened:
+            self._update_best(node)
+
+
+    def update(self, nodes):
+        """
+        ===================================================================
+         Description: Restore the Order after the given Nodes were
+                       updated in place O(n).
+        ===================================================================
+         Arguments: nodes : list of Node (already in the Opened Set).
+        ===================================================================
+        """
+        self.refresh()
+
+
+    def clear(self):
+        """
+        ===================================================================
+         Description: Remove all the Nodes (reuse the Opened Set).
+        ===================================================================
+        """
+        self._opened.clear()
+        self._best = None
+
+
+    def __len__(self):
+        return len(self._opened)
+
+
+    def __iter__(self):
+        return iter(self._opened)
+
+    
+    #=================================================================
+    # Check the Node as candidate to be the Best Node
+    #=================================================================
+    # Complexity: O(1)
+    #=================================================================
+    # Edited: 10/09/2018
+    #=================================================================
+    def _update_best(self, node):
+        if (self._best is None):
+            self._best = node
+        else:
+            self._best = min(self._best,node)
+            
+    
+    #=================================================================
+    # List of Nodes where the Best Node is the first Node
+    #=================================================================
+    # Edited: 10/09/2018
+    #=================================================================
+    def __str__(self):
+        if self.is_empty(): return 'Empty Opened'
+        
+        temp = '{}\n'.format(self._best)
+        for node in self._opened:
+            if (node != self._best):
+                temp += '{}\n'.format(node)
+        return temp
+
+
+
+#=====================================================================
+# Opened as Binary Heap with lazy deletion
+#=====================================================================
+# Entries are (node.key, node) with key = (f, -g, idd): lower F first,
+#   then higher G, then lower Idd, as in Node.__lt__ and Opened.
+#   Removed or replaced Nodes stay in the Heap and are skipped when
+#   they reach the top.
+#=====================================================================
+class OpenedHeap:
+
+
+    def __init__(self):
+        """
+        ===================================================================
+         Description: Init empty Opened Heap.
+        ===================================================================
+        """
+        self._heap = list()
+        self._entries = dict()
+
+
+    def push(self, node):
+        """
+        ===================================================================
+         Description: Push Node into the Opened Heap O(log n).
+        ===================================================================
+         Arguments: node : Node
+        ===================================================================
+        """
+        entry = (node.key, node)
+        self._entries[node.idd] = entry
+        heapq.heappush(self._heap, entry)
+
+
+    def pop(self):
+        """
+        ===================================================================
+         Description: Return the Best Node and Remove it O(log n).
+        ===================================================================
+         Return: Node (None if the Opened Heap is empty).
+        ===================================================================
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            node = entry[1]
+            if self._entries.get(node.idd) is entry:
+                del self._entries[node.idd]
+                return node
+        return None
+
+
+    def remove(self, node):
+        """
+        ===================================================================
+         Description: Remove the Node (lazy deletion) O(1).
+        ===================================================================
+         Arguments: node : Node
+        ===================================================================
+        """
+        del self._entries[node.idd]
+
+
+    def contains(self, node):
+        """
+        ===================================================================
+         Description: Return True if Opened Heap contains the Node.
+        ===================================================================
+         Arguments: node : Node
+        ===================================================================
+        """
+        return node.idd in self._entries
+
+
+    def is_empty(self):
+        return (len(self._entries) == 0)
+
+
+    def refresh(self):
+        """
+        ===================================================================
+         Description: Rebuild the Heap from the live Nodes after their
+                       F or G were updated in place O(n).
+        ===================================================================
+        """
+        self._heap = list()
+        for node in [entry[1] for entry in self._entries.values()]:
+            entry = (node.key, node)
+            self._entries[node.idd] = entry
+            self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+
+    def update(self, nodes):
+        """
+        ===================================================================
+         Description: Re-push the given Nodes after their F or G were
+                       updated in place O(k log n). Their old entries
+                       become stale.
+        ===================================================================
+         Arguments: nodes : list of Node (already in the Opened Heap).
+        ===================================================================
+        """
+        if (2 * len(nodes) > len(self._entries)):
+            self.refresh()
+            return
+        for node in nodes:
+            self.push(node)
+
+
+    def clear(self):
+        """
+        ===================================================================
+         Description: Remove all the Nodes (reuse the Opened Heap).
+        ===================================================================
+        """
+        self._heap.clear()
+        self._entries.clear()
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __iter__(self):
+        return iter([entry[1] for entry in self._entries.values()])
+
+
+#=====================================================================
+# Opened as Buckets by integer F (unit-cost Grids)
+#=====================================================================
+# Each Bucket is a small Heap of (node.key, node), so ties on F are
+#   broken by higher G, then lower Idd, as in Node.__lt__. The cursor
+#   walks up the F values, which change by small integer steps on
+#   unit-cost Grids.
+#=====================================================================
+class OpenedBucket:
+
+
+    def __init__(self):
+        """
+        ===================================================================
+         Description: Init empty Opened Buckets.
+        ===================================================================
+        """
+        self._buckets = dict()
+        self._entries = dict()
+        self._f_min = None
+
+
+    def push(self, node):
+        """
+        ===================================================================
+         Description: Push Node into its F Bucket O(log b).
+        ===================================================================
+         Arguments: node : Node (with integer F)
+        ===================================================================
+        """
+        f = int(node.f)
+        if (f != node.f):
+            raise ValueError('OpenedBucket needs integer F '
+                             '(use OpenedHeap for octile Graphs)')
+        entry = (node.key, node)
+        self._entries[node.idd] = entry
+        heapq.heappush(self._buckets.setdefault(f, list()), entry)
+        if (self._f_min is None) or (f < self._f_min):
+            self._f_min = f
+
+
+    def pop(self):
+        """
+        ===================================================================
+         Description: Return the Best Node and Remove it.
+        ===================================================================
+         Return: Node (None if the Opened Buckets are empty).
+        ===================================================================
+        """
+        while self._entries:
+            bucket = self._buckets.get(self._f_min)
+            if not bucket:
+                self._buckets.pop(self._f_min, None)
+                self._f_min += 1
+                continue
+            entry = heapq.heappop(bucket)
+            node = entry[1]
+            if self._entries.get(node.idd) is entry:
+                del self._entries[node.idd]
+                return node
+        self._buckets.clear()
+        self._f_min = None
+        return None
+
+
+    def remove(self, node):
+        """
+        ===================================================================
+         Description: Remove the Node (lazy deletion) O(1).
+        ===================================================================
+         Arguments: node : Node
+        ===================================================================
+        """
+        del self._entries[node.idd]
+
+
+    def contains(self, node):
+        """
+        ===================================================================
+         Description: Return True if Opened Buckets contain the Node.
+        ===================================================================
+         Arguments: node : Node
+        ===================================================================
+        """
+        return node.idd in self._entries
+
+
+    def is_empty(self):
+        return (len(self._entries) == 0)
+
+
+    def refresh(self):
+        """
+        ===================================================================
+         Description: Rebuild the Buckets from the live Nodes after their
+                       F or G were updated in place O(n).
+        ===================================================================
+        """
+        nodes = [entry[1] for entry in self._entries.values()]
+        self._buckets = dict()
+        self._entries = dict()
+        self._f_min = None
+        for node in nodes:
+            self.push(node)
+
+
+    def update(self, nodes):
+        """
+        ===================================================================
+         Description: Move the given Nodes to their new F Buckets after
+                       their F or G were updated in place O(k log b).
+        ===================================================================
+         Arguments: nodes : list of Node (already in the Opened Buckets).
+        ===================================================================
+        """
+        for node in nodes:
+            self.push(node)
+
+
+    def clear(self):
+        """
+        ===================================================================
+         Description: Remove all the Nodes (reuse the Opened Buckets).
+        ===================================================================
+        """
+        self._buckets.clear()
+        self._entries.clear()
+        self._f_min = None
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __iter__(self):
+        return iter([entry[1] for entry in self._entries.values()])
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from .node import Node
+
+    def tester_backends():
+        p1 = True
+        for i in range(100):
+            nodes = list()
+            for idd in range(20):
+                node = Node(idd)
+                node.g = random.randint(0,5)
+                node.f = node.g + random.randint(0,5)
+                nodes.append(node)
+            removed = set(random.sample(range(20),5))
+            poped = list()
+            # Pushed in another Order by each Backend: Ties break by Idd
+            for backend in (Opened, OpenedHeap, OpenedBucket):
+                opened = backend()
+                for node in random.sample(nodes, len(nodes)):
+                    opened.push(node)
+                keys = list()
+                while not opened.is_empty():
+                    node = opened.pop()
+                    keys.append(node.key)
+                poped.append(keys)
+            for backend in (OpenedHeap, OpenedBucket):
+                opened = backend()
+                for node in nodes:
+                    opened.push(node)
+                for idd in removed:
+                    opened.remove(nodes[idd])
+                keys = list()
+                while not opened.is_empty():
+                    node = opened.pop()
+                    keys.append(node.key)
+                poped.append(keys)
+            p1 = p1 and (poped[0] == poped[1] == poped[2] == sorted(poped[0]))
+            p1 = p1 and (poped[3] == poped[4]) and (len(poped[3]) == 15)
+
+        opened = OpenedHeap()
+        node = Node(1)
+        node.f = 3
+        opened.push(node)
+        p2 = opened.contains(Node(1)) and not opened.contains(Node(2))
+        node.f = 1
+        opened.refresh()
+        p3 = (len(opened) == 1) and (opened.pop() is node) and opened.is_empty()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_backends()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
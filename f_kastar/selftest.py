@@ -0,0 +1,66 @@
+"""
+===============================================================================
+ Run the Self-Tests (the tester() of each Module) of the Package.
+-------------------------------------------------------------------------------
+ Usage:
+    python -m f_kastar.selftest
+    python -m f_kastar.selftest kastar jps
+-------------------------------------------------------------------------------
+ The Testers run from the Directory of the Map Files (the Repository Root)
+  and the Exit Code is the Number of failed Tests (capped at 255).
+===============================================================================
+"""
+import io
+import os
+import sys
+import contextlib
+import importlib
+
+from . import _SUBMODULES
+
+
+# Modules without a tester()
+SKIP = ('u_random',)
+
+# Directory of the MovingAI Map Files used by some Testers
+DIR_DATA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(names=None):
+    """
+    ===========================================================================
+     Description: Run the Testers of the given Modules and count Failures.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. names : list of str (Module Names, all Modules if None).
+    ===========================================================================
+     Return: int (Number of failed Tests).
+    ===========================================================================
+    """
+    if not names:
+        names = [name for name in _SUBMODULES if name not in SKIP]
+    failed = 0
+    cwd = os.getcwd()
+    os.chdir(DIR_DATA)
+    try:
+        for name in names:
+            module = importlib.import_module('.' + name, __package__)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                module.tester()
+            lines = out.getvalue().splitlines()
+            failures = [line for line in lines if line.startswith('Failed')]
+            oks = [line for line in lines if line.startswith('OK')]
+            print('{0}: {1} ok, {2} failed'.format(name, len(oks),
+                                                   len(failures)))
+            for line in failures:
+                print('    ' + line)
+            failed += len(failures)
+    finally:
+        os.chdir(cwd)
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(min(run(sys.argv[1:]), 255))
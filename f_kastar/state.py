@@ -0,0 +1,171 @@
+from array import array
+import numpy as np
+
+
+INF = float('Infinity')
+
+
+class State:
+    """
+    ===========================================================================
+     Description: Search State as flat Arrays indexed by Idd.
+    ---------------------------------------------------------------------------
+        1. g : array of double (inf when not set in this Query).
+        2. father : array of int (-1 when not set in this Query).
+        3. Closed marks : array of uint32.
+    ---------------------------------------------------------------------------
+        H and F are not stored by Cell: the Search reads them from the
+         Nodes of the Opened, so a Cell costs 20 Bytes (G 8, Father 4,
+         Generation Stamp 4 and Closed mark 4).
+    ---------------------------------------------------------------------------
+        Every Cell carries the Generation in which it was last written.
+         A Cell written in an older Generation reads as untouched, so
+         reset() for the next Query is O(1) instead of O(Cells).
+    ===========================================================================
+    """
+
+    def __init__(self, size):
+        """
+        =======================================================================
+         Description: Init State for a Grid of the given Size (Cells).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. size : int (Amount of Cells in the Grid).
+        =======================================================================
+        """
+        self.size = size
+        self.generation = 1
+        typecode = 'i' if (size < 2**31) else 'q'
+        self.g = array('d', bytes(8 * size))
+        self.father = array(typecode, bytes(array(typecode).itemsize * size))
+        self._stamp = array('I', bytes(4 * size))
+        self._closed = array('I', bytes(4 * size))
+
+
+    def reset(self):
+        """
+        =======================================================================
+         Description: Forget all the Values for a new Query O(1).
+        =======================================================================
+        """
+        self.generation += 1
+        if (self.generation == 2**32):
+            self._stamp = array('I', bytes(4 * self.size))
+            self._closed = array('I', bytes(4 * self.size))
+            self.generation = 1
+
+
+    def get_g(self, idd):
+        """
+        =======================================================================
+         Description: Return G of the Idd (inf if untouched).
+        =======================================================================
+        """
+        if (self._stamp[idd] != self.generation):
+            return INF
+        return self.g[idd]
+
+
+    def get_father(self, idd):
+        """
+        =======================================================================
+         Description: Return Father's Idd of the Idd (-1 if untouched).
+        =======================================================================
+        """
+        if (self._stamp[idd] != self.generation):
+            return -1
+        return self.father[idd]
+
+
+    def set(self, idd, father, g):
+        """
+        =======================================================================
+         Description: Set Father and G of the Idd.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. idd : int (Node's Id).
+            2. father : int (Father's Id, -1 for the Start).
+            3. g : int
+        =======================================================================
+        """
+        self._stamp[idd] = self.generation
+        self.father[idd] = father
+        self.g[idd] = g
+
+
+    def close(self, idd):
+        """
+        =======================================================================
+         Description: Mark the Idd as Closed.
+        =======================================================================
+        """
+        self._closed[idd] = self.generation
+
+
+    def is_closed(self, idd):
+        """
+        =======================================================================
+         Description: Return True if the Idd is Closed.
+        =======================================================================
+        """
+        return self._closed[idd] == self.generation
+
+
+    def get_closed(self):
+        """
+        =======================================================================
+         Description: Return List of Closed Idds (ascending) O(Cells).
+        =======================================================================
+        """
+        closed = np.frombuffer(self._closed, dtype=np.uint32)
+        return np.flatnonzero(closed == self.generation).tolist()
+
+
+    def nbytes(self):
+        """
+        =======================================================================
+         Description: Return Memory of the Arrays in Bytes.
+        =======================================================================
+        """
+        arrays = (self.g, self.father, self._stamp, self._closed)
+        return sum(x.itemsize * len(x) for x in arrays)
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+
+    def tester_reset():
+        state = State(10)
+        p1 = (state.get_g(3) == INF) and (state.get_father(3) == -1)
+        state.set(3, 2, 5)
+        state.close(3)
+        p2 = (state.get_g(3) == 5) and (state.get_father(3) == 2)
+        p2 = p2 and state.is_closed(3) and (state.nbytes() == 20 * 10)
+        p3 = state.get_closed() == [3]
+        state.reset()
+        p4 = (state.get_g(3) == INF) and not state.is_closed(3)
+        p5 = state.get_closed() == []
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_reset()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
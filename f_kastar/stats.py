@@ -0,0 +1,253 @@
+import time
+import functools
+
+
+class Stats:
+    """
+    ===========================================================================
+     Description: Instrumentation of a Search (KAStar, JPS or AStar).
+    ---------------------------------------------------------------------------
+        1. Counters: expanded, pushed, reopened (lower G for an already
+            reached Node), popped, goals (Goal hits) and opened_peak
+            (max Size of the Opened).
+        2. Timers (optional): Seconds per Phase (pop, expand, neighbors,
+            heuristic, reprioritize). The Phases are inclusive, expand
+            contains the neighbors and heuristic Time of its Children.
+        3. Callbacks (optional): on_expand(idd) before a Node is expanded
+            and on_goal(goal, cost) when a Goal is Closed.
+    ---------------------------------------------------------------------------
+        A Search without Stats (stats=None) only tests one Attribute per
+         Event and its Methods are not wrapped, so it costs nothing else.
+         One Stats can be shared by many Searches to sum their Counters.
+    ===========================================================================
+    """
+
+    COUNTERS = ('expanded', 'pushed', 'reopened', 'popped', 'goals',
+                'opened_peak')
+
+    def __init__(self, timers=False, on_expand=None, on_goal=None):
+        """
+        =======================================================================
+         Description: Init Stats.
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. timers : bool (Measure the Time per Phase).
+            2. on_expand : callable (Called with the Idd of the Node).
+            3. on_goal : callable (Called with the Goal Idd and its Cost).
+        =======================================================================
+        """
+        self.timers = dict() if timers else None
+        self.on_expand = on_expand
+        self.on_goal = on_goal
+        self.reset()
+
+
+    def reset(self):
+        """
+        =======================================================================
+         Description: Zero the Counters and the Timers.
+        =======================================================================
+        """
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        if self.timers is not None:
+            self.timers = dict()
+
+
+    def push(self, size):
+        """
+        =======================================================================
+         Description: Count a Push into an Opened of the given Size.
+        =======================================================================
+        """
+        self.pushed += 1
+        if (size > self.opened_peak):
+            self.opened_peak = size
+
+
+    def expand(self, idd):
+        """
+        =======================================================================
+         Description: Count the Expansion of the Idd.
+        =======================================================================
+        """
+        self.expanded += 1
+        if self.on_expand is not None:
+            self.on_expand(idd)
+
+
+    def goal(self, goal, cost):
+        """
+        =======================================================================
+         Description: Count the Hit of the Goal.
+        =======================================================================
+        """
+        self.goals += 1
+        if self.on_goal is not None:
+            self.on_goal(goal, cost)
+
+
+    def attach(self, obj, phases):
+        """
+        =======================================================================
+         Description: Wrap Methods of the Object by the Timer of their Phase
+                       (nothing is done when the Timers are off).
+        -----------------------------------------------------------------------
+            The Wrappers are set as Attributes of the Instance, so the Class
+             and other Instances are untouched. A Method already wrapped is
+             wrapped again from its original (no double counting).
+        =======================================================================
+         Arguments:
+        -----------------------------------------------------------------------
+            1. obj : object (Search or its Heuristic).
+            2. phases : list of tuple (phase, name) : (str, str).
+        =======================================================================
+        """
+        if self.timers is None:
+            return
+        for phase, name in phases:
+            func = getattr(obj, name)
+            func = getattr(func, '__wrapped__', func)
+            setattr(obj, name, self._timer(phase, func))
+
+
+    def as_dict(self):
+        """
+        =======================================================================
+         Description: Return the Counters and the Timers as a flat Dict.
+        =======================================================================
+         Return: dict of {str: int or float} (Timers as time_<phase>).
+        =======================================================================
+        """
+        res = {name: getattr(self, name) for name in self.COUNTERS}
+        for phase, seconds in (self.timers or dict()).items():
+            res['time_' + phase] = seconds
+        return res
+
+
+    def _timer(self, phase, func):
+        """
+        =======================================================================
+         Description: Return func wrapped to add its Time to the Phase.
+        -----------------------------------------------------------------------
+            Only the outermost Call is timed (recursive Methods as the JPS
+             Jumps are not counted twice).
+        =======================================================================
+        """
+        self.timers.setdefault(phase, 0.0)
+        clock = time.perf_counter
+        depth = [0]
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if depth[0]:
+                return func(*args)
+            depth[0] = 1
+            t = clock()
+            try:
+                return func(*args)
+            finally:
+                depth[0] = 0
+                self.timers[phase] = self.timers.get(phase, 0.0) + clock() - t
+        return wrapper
+
+
+    def __repr__(self):
+        items = ', '.join('{0}={1}'.format(name, getattr(self, name))
+                          for name in self.COUNTERS)
+        return 'Stats({0})'.format(items)
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import random
+    from . import u_grid
+    from .kastar import KAStar
+    from .astar_original import AStar
+
+    def tester_kastar():
+        grid = u_grid.gen_symmetric_grid(10)
+        expanded = list()
+        hits = list()
+        stats = Stats(timers=True, on_expand=expanded.append,
+                      on_goal=lambda goal, cost: hits.append((goal, cost)))
+        kastar = KAStar(grid, 40, [48, 34], stats=stats)
+        kastar.run()
+        p1 = hits == [(x, kastar.get_cost(x)) for x in (34, 48)]
+        p2 = (stats.goals == 2) and (stats.expanded == len(expanded))
+        p3 = stats.popped == stats.expanded + 1
+        p4 = 0 < stats.opened_peak <= stats.pushed
+        p5 = all(phase in stats.timers for phase in
+                 ('pop', 'expand', 'neighbors', 'heuristic', 'reprioritize'))
+        # Same Search without Stats
+        kastar_plain = KAStar(grid, 40, [48, 34])
+        kastar_plain.run()
+        p6 = kastar_plain.get_path(48) == kastar.get_path(48)
+        p7 = '_expand' not in vars(kastar_plain)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5 and p6 and p7):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_astar():
+        random.seed(1)
+        grid = u_grid.gen_obstacles_grid(20, 30)
+        idds = u_grid.get_valid_idds(grid)
+        p1 = True
+        for _ in range(20):
+            start, goal = random.sample(idds, 2)
+            stats = Stats(timers=True)
+            astar = AStar(grid, start, goal, stats=stats)
+            astar.run()
+            if astar.best is None:
+                p1 = p1 and (stats.goals == 0)
+                continue
+            p1 = p1 and (stats.goals == 1)
+            p1 = p1 and (stats.popped == stats.expanded + 1)
+            p1 = p1 and ('heuristic' in stats.timers)
+            stats_bi = Stats()
+            astar_bi = AStar(grid, start, goal, bidirectional=True,
+                             stats=stats_bi)
+            astar_bi.run()
+            p1 = p1 and (stats_bi.goals == 1) and (stats_bi.expanded > 0)
+            p1 = p1 and (stats_bi.popped >= stats_bi.expanded)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    def tester_reset():
+        stats = Stats()
+        stats.push(3)
+        stats.expand(0)
+        p1 = (stats.pushed == 1) and (stats.opened_peak == 3)
+        stats.reset()
+        p2 = stats.as_dict() == {name: 0 for name in Stats.COUNTERS}
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_kastar()
+    tester_astar()
+    tester_reset()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -0,0 +1,417 @@
+import os
+import json
+import struct
+import hashlib
+import numpy as np
+
+from . import u_map
+from . import u_grid
+from . import landmarks
+from .graph import Graph
+
+
+"""
+===============================================================================
+ Compiled Map File:
+-------------------------------------------------------------------------------
+    1. Magic b'FKMAP\0' and Header Size (uint32, little-endian).
+    2. Header as JSON: Version, Key and dtype/shape/offset of each Array.
+    3. Raw Array Buffers, each aligned to ALIGN Bytes from the File start.
+-------------------------------------------------------------------------------
+ Arrays are opened by np.memmap (read-only), so all the Processes that load
+  the same File share its Pages without copies.
+===============================================================================
+"""
+MAGIC = b'FKMAP\0'
+VERSION = 2
+ALIGN = 64
+EXT = '.fkc'
+
+
+def get_key(data, *args):
+    """
+    ===========================================================================
+     Description: Return Content Hash of the Source (and of the Arguments
+                   that change the compiled Result).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. data : bytes (Content of the Source .map).
+        2. args : str (Extra Arguments, ex: Passable Chars).
+    ===========================================================================
+     Return: str (SHA-256 Hex Digest).
+    ===========================================================================
+    """
+    sha = hashlib.sha256(data)
+    for arg in args:
+        sha.update(b'\0' + str(arg).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def save(path, arrays, key):
+    """
+    ===========================================================================
+     Description: Write Arrays to a versioned Compiled Map File.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the Compiled Map File).
+        2. arrays : dict str:Numpy Array.
+        3. key : str (Content Hash of the Source).
+    ===========================================================================
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    # Offsets depend on the Header Size, so grow the Room until it fits
+    size_header = 256
+    while True:
+        header = {'version': VERSION, 'key': key, 'arrays': dict()}
+        offset = _align(len(MAGIC) + 4 + size_header)
+        for name, array in arrays.items():
+            header['arrays'][name] = {'dtype': array.dtype.str,
+                                      'shape': list(array.shape),
+                                      'offset': offset}
+            offset = _align(offset + array.nbytes)
+        text = json.dumps(header).encode('utf-8')
+        if (len(text) <= size_header):
+            break
+        size_header *= 2
+    text = text.ljust(size_header, b' ')
+    path_temp = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(path_temp, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<I', size_header))
+        file.write(text)
+        for name, array in arrays.items():
+            file.seek(header['arrays'][name]['offset'])
+            file.write(array.tobytes())
+    os.replace(path_temp, path)
+
+
+def load(path, key=None):
+    """
+    ===========================================================================
+     Description: Open the Arrays of a Compiled Map File by np.memmap.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the Compiled Map File).
+        2. key : str (Expected Content Hash, None to skip the Check).
+    ===========================================================================
+     Return: dict str:np.memmap (None if the File is missing, of another
+              Version or compiled from another Source).
+    ===========================================================================
+    """
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as file:
+        if (file.read(len(MAGIC)) != MAGIC):
+            return None
+        size_header = struct.unpack('<I', file.read(4))[0]
+        header = json.loads(file.read(size_header).decode('utf-8'))
+    if (header['version'] != VERSION):
+        return None
+    if (key is not None) and (header['key'] != key):
+        return None
+    arrays = dict()
+    for name, info in header['arrays'].items():
+        shape = tuple(info['shape'])
+        if (0 in shape):
+            arrays[name] = np.empty(shape, dtype=info['dtype'])
+            continue
+        arrays[name] = np.memmap(path, dtype=info['dtype'], mode='r',
+                                 offset=info['offset'], shape=shape)
+    return arrays
+
+
+def load_graph(path_map, path_cache=None, chars_valid=u_map.CHARS_VALID,
+               octile=False, costs=None):
+    """
+    ===========================================================================
+     Description: Return the compiled Graph of the MovingAI Map.
+    ---------------------------------------------------------------------------
+        1. Hash the Source Map (and the Passable Chars).
+        2. If the Compiled Map File has the same Hash - memmap its Arrays.
+        3. Else - load, serialize and compile the Map and write the File.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to the .map or .map.zip File).
+        2. path_cache : str (Path to the Compiled Map File, by default
+                              next to the Map with the .fkc extension, or
+                              .oct.fkc if octile).
+        3. chars_valid : str (Passable Chars).
+        4. octile : bool (8-connected Graph, as the MovingAI 'octile' Maps
+                           are meant to be searched).
+        5. costs : dict str:float (Char : Cell Cost of weighted Terrain,
+                                    replaces chars_valid) or None.
+    ===========================================================================
+     Return: Graph (Grid, CSR Neighbors, Valid Idds and Components).
+    ===========================================================================
+    """
+    if costs is not None:
+        chars_valid = ''.join(costs)
+    if path_cache is None:
+        path_cache = get_path_cache(path_map, ('.oct' if octile else '') +
+                                    ('.w' if costs else ''))
+    data = u_map.read(path_map)
+    extra = ['octile'] if octile else []
+    if costs is not None:
+        extra.append(json.dumps(costs, sort_keys=True))
+    key = get_key(data, chars_valid, *extra)
+    arrays = load(path_cache, key)
+    if arrays is None:
+        grid = u_grid.serialize(u_map.to_grid(data, chars_valid))
+        costs_cells = None
+        if costs is not None:
+            costs_cells = u_map.to_costs(data, costs)
+        graph = Graph(grid, octile=octile, costs=costs_cells)
+        arrays = {'grid': graph.grid,
+                  'indptr': graph.indptr,
+                  'indices': graph.indices,
+                  'idds_valid': graph.get_valid_idds(),
+                  'components': graph.get_components()}
+        if graph.weights is not None:
+            arrays['weights'] = graph.weights
+        if costs is not None:
+            arrays['costs'] = graph.costs
+        save(path_cache, arrays, key)
+        arrays = load(path_cache, key)
+    return Graph(arrays['grid'], arrays['indptr'], arrays['indices'],
+                 arrays.get('weights'), arrays['idds_valid'],
+                 arrays['components'], octile, arrays.get('costs'))
+
+
+def load_landmarks(path_map, n=8, path_cache=None,
+                   chars_valid=u_map.CHARS_VALID, graph=None, octile=False):
+    """
+    ===========================================================================
+     Description: Return the Landmark (ALT) Tables of the MovingAI Map.
+    ---------------------------------------------------------------------------
+        Same Scheme as load_graph(): the Tables are selected once and kept
+         in their own File next to the Compiled Map. The Tables are Hop
+         Counts, so the Key is made of what decides them: the Passable
+         Mask and the Connectivity of the Graph used (and n). Cell Costs
+         are left out, so weighted and unit-cost Graphs of the same Mask
+         share the File instead of rewriting it in turn.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to the .map or .map.zip File).
+        2. n : int (Amount of Landmarks).
+        3. path_cache : str (Path to the Tables File, by default next to
+                              the Map with the .alt.fkc extension).
+        4. chars_valid : str (Passable Chars, to load the Graph if None).
+        5. graph : Graph (compiled Map, loaded by load_graph() if None).
+        6. octile : bool (Tables of the 8-connected Graph, must match the
+                           Connectivity of the given Graph).
+    ===========================================================================
+     Return: Landmarks (Tables are np.memmap).
+    ===========================================================================
+    """
+    if (graph is not None) and (bool(graph.octile) != bool(octile)):
+        raise ValueError('octile={0} does not match the {1}-connected Graph'
+                         .format(octile, 8 if graph.octile else 4))
+    if path_cache is None:
+        path_cache = get_path_cache(path_map, '.oct.alt' if octile else '.alt')
+    if graph is None:
+        graph = load_graph(path_map, chars_valid=chars_valid, octile=octile)
+    mask = np.asarray(graph.grid) >= 0
+    key = get_key(np.packbits(mask).tobytes(), mask.shape, 'landmarks', n,
+                  *(['octile'] if octile else []))
+    arrays = load(path_cache, key)
+    if arrays is None:
+        tables = landmarks.select(graph, n)
+        save(path_cache, {'idds': tables.idds, 'dists': tables.dists}, key)
+        arrays = load(path_cache, key)
+    return landmarks.Landmarks(arrays['idds'], arrays['dists'], octile)
+
+
+def load_jumps(path_map, path_cache=None, chars_valid=u_map.CHARS_VALID,
+               graph=None, octile=False):
+    """
+    ===========================================================================
+     Description: Return the Jump Table (JPS+) of the MovingAI Map.
+    ---------------------------------------------------------------------------
+        Same Scheme as load_graph(), in its own File next to the Map.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to the .map or .map.zip File).
+        2. path_cache : str (Path to the Table File, by default next to the
+                              Map with the .jps.fkc extension).
+        3. chars_valid : str (Passable Chars).
+        4. graph : Graph (compiled Map, loaded by load_graph() if None).
+        5. octile : bool (Table of the 8-connected Graph).
+    ===========================================================================
+     Return: np.memmap of int32 (Directions x padded Cells).
+    ===========================================================================
+    """
+    from . import jps
+    if path_cache is None:
+        path_cache = get_path_cache(path_map, '.oct.jps' if octile else '.jps')
+    key = get_key(u_map.read(path_map), chars_valid, 'jumps',
+                  *(['octile'] if octile else []))
+    arrays = load(path_cache, key)
+    if arrays is None:
+        if graph is None:
+            graph = load_graph(path_map, chars_valid=chars_valid,
+                               octile=octile)
+        save(path_cache, {'table': jps.build_table(graph)}, key)
+        arrays = load(path_cache, key)
+    return arrays['table']
+
+
+def get_path_cache(path_map, suffix=''):
+    """
+    ===========================================================================
+     Description: Return default Path of the Compiled Map File.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path_map : str (Path to the .map or .map.zip File).
+        2. suffix : str (inserted before the Extension, ex: '.alt').
+    ===========================================================================
+     Return: str (ex: 'lak102d.map.zip' -> 'lak102d.map.fkc').
+    ===========================================================================
+    """
+    if path_map.endswith('.zip'):
+        path_map = path_map[:-len('.zip')]
+    return path_map + suffix + EXT
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+
+"""
+===============================================================================
+===============================================================================
+=========================  Tester  ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+    import tempfile
+
+    def tester_save_load():
+        path = os.path.join(tempfile.mkdtemp(), 'temp.fkc')
+        arrays = {'a': np.arange(10, dtype=np.int32),
+                  'b': np.ones((3,4)),
+                  'c': np.empty(0, dtype=np.int64)}
+        save(path, arrays, 'key')
+        loaded = load(path, 'key')
+        p1 = all((loaded[name] == arrays[name]).all() for name in arrays)
+        p2 = isinstance(loaded['a'], np.memmap)
+        p3 = load(path, 'other') is None
+        p4 = load(path + '.missing') is None
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_load_graph():
+        path_cache = os.path.join(tempfile.mkdtemp(), 'lak102d.map.fkc')
+        graph_1 = load_graph('lak102d.map.zip', path_cache)
+        graph_2 = load_graph('lak102d.map.zip', path_cache)
+        grid = u_grid.serialize(u_map.load_map('lak102d.map.zip'))
+        p1 = (graph_2.grid == grid).all()
+        p2 = (graph_1.indices == graph_2.indices).all()
+        p3 = isinstance(graph_2.indptr, np.memmap)
+        p4 = graph_2.get_valid_idds().tolist() == u_grid.get_valid_idds(grid)
+        p4 = p4 and isinstance(graph_2.components, np.memmap)
+        graph_3 = load_graph('lak102d.map.zip', path_cache, '.T')
+        p5 = len(graph_3.get_valid_idds()) > len(graph_2.get_valid_idds())
+        graph_4 = load_graph('lak102d.map.zip', path_cache, octile=True)
+        graph_5 = load_graph('lak102d.map.zip', path_cache, octile=True)
+        p5 = p5 and graph_5.octile and isinstance(graph_5.weights, np.memmap)
+        p5 = p5 and len(graph_5.indices) > len(graph_2.indices)
+        graph_6 = load_graph('lak102d.map.zip', path_cache, costs={'.':2, 'T':3})
+        graph_7 = load_graph('lak102d.map.zip', path_cache, costs={'.':2, 'T':3})
+        p5 = p5 and graph_7.cost_min == 2 and isinstance(graph_7.costs, np.memmap)
+        p5 = p5 and (graph_6.weights == graph_7.weights).all()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_load_landmarks():
+        folder = tempfile.mkdtemp()
+        path_cache = os.path.join(folder, 'lak102d.map.alt.fkc')
+        graph = load_graph('lak102d.map.zip', os.path.join(folder, 'g.fkc'))
+        tables_1 = load_landmarks('lak102d.map.zip', 4, path_cache, graph=graph)
+        tables_2 = load_landmarks('lak102d.map.zip', 4, path_cache)
+        p1 = (tables_1.dists == tables_2.dists).all() and len(tables_2) == 4
+        p2 = isinstance(tables_2.dists, np.memmap)
+        p3 = tables_2.dists.dtype == np.int32
+        tables_3 = load_landmarks('lak102d.map.zip', 2, path_cache, graph=graph)
+        p4 = len(tables_3) == 2
+        p5 = get_path_cache('a.map.zip', '.alt') == 'a.map.alt' + EXT
+        # Other Passable Mask ('T' passable): own Tables, not the File's
+        load_landmarks('lak102d.map.zip', 2, path_cache)
+        graph_t = load_graph('lak102d.map.zip', os.path.join(folder, 't.fkc'),
+                             costs={'.': 1, 'T': 2})
+        tables_t = load_landmarks('lak102d.map.zip', 2, path_cache,
+                                  graph=graph_t)
+        p6 = np.array_equal(tables_t.dists, landmarks.select(graph_t, 2).dists)
+        p6 = p6 and not np.array_equal(tables_t.dists,
+                                       landmarks.select(graph, 2).dists)
+        # Same Mask with other Costs: the File is reused, not rewritten
+        load_landmarks('lak102d.map.zip', 2, path_cache)
+        inode = os.stat(path_cache).st_ino
+        graph_w = load_graph('lak102d.map.zip', os.path.join(folder, 'w.fkc'),
+                             costs={'.': 1, 'G': 1, 'S': 3})
+        tables_w = load_landmarks('lak102d.map.zip', 2, path_cache,
+                                  graph=graph_w)
+        p6 = p6 and (os.stat(path_cache).st_ino == inode)
+        p6 = p6 and np.array_equal(tables_w.dists,
+                                   landmarks.select(graph, 2).dists)
+        try:
+            load_landmarks('lak102d.map.zip', 2, path_cache, graph=graph,
+                           octile=True)
+            p7 = False
+        except ValueError:
+            p7 = True
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5 and p6 and p7):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_load_jumps():
+        from . import jps
+        folder = tempfile.mkdtemp()
+        path_cache = os.path.join(folder, 'lak102d.map.jps.fkc')
+        graph = load_graph('lak102d.map.zip', os.path.join(folder, 'g.fkc'),
+                           octile=True)
+        table_1 = load_jumps('lak102d.map.zip', path_cache, graph=graph,
+                             octile=True)
+        table_2 = load_jumps('lak102d.map.zip', path_cache, octile=True)
+        p1 = (table_1 == jps.build_table(graph)).all()
+        p2 = isinstance(table_2, np.memmap) and (table_1 == table_2).all()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+    print('\n====================\nStart Tester\n====================')
+    tester_save_load()
+    tester_load_graph()
+    tester_load_landmarks()
+    tester_load_jumps()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()
@@ -1,6 +1,6 @@
 import random
 import numpy as np
-import u_lists
+from . import u_lists
 import math
 
 
@@ -117,9 +117,8 @@ def lists_to_grid(lists):
     
     grid = np.full(shape=[rows,cols], fill_value=-1, dtype=int)
 
-    for row in range(rows):
-        for col in range(len(lists[row])):
-            grid[row][col] = lists[row][col]
+    for row, li in enumerate(lists):
+        grid[row,:len(li)] = li
         
     return grid
 
@@ -217,11 +216,9 @@ def get_valid_idds(grid):
      Return: List of Valid Idd (int).
     ===========================================================================
     """
-    valid_idds = []
-    for idd in np.nditer(grid):
-        if is_valid_idd(grid, idd):
-            valid_idds.append(int(idd))
-    return valid_idds            
+    flat = grid.ravel()
+    idds = flat[(flat >= 0) & (flat < flat.size)]
+    return idds[flat[idds] != -1].tolist()
     
     
 def get_neighbors(grid, row, col):
@@ -254,7 +251,175 @@ def get_neighbors(grid, row, col):
     if (col > 0):
         add_neighbor(row, col-1)
     
-    return neighbors        
+    return neighbors
+
+
+# Moves (Row, Col) by the Bit of the Direction Mask: 4-connected first
+DIRECTIONS = ((-1,0), (0,1), (1,0), (0,-1),
+              (-1,1), (1,1), (1,-1), (-1,-1))
+
+SQRT2 = math.sqrt(2)
+
+
+def get_masks(grid, octile=False):
+    """
+    ===========================================================================
+     Description: Return the Direction Mask of every Cell.
+    ---------------------------------------------------------------------------
+        Bit i of the Mask is set if the Move by DIRECTIONS[i] from the Cell
+         stays in the Grid and ends in a Valid Cell. Diagonal Moves (only if
+         octile) must not cut Corners: both adjacent Cells must be Valid.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Serialized Grid.
+        2. octile : bool (8-connected, else 4-connected).
+    ===========================================================================
+     Return: 2D Numpy Array of uint8.
+    ===========================================================================
+    """
+    rows, cols = grid.shape
+    # Padded by a Blocked Border, so the shifted Views need no Bounds Checks
+    valid = np.zeros((rows+2, cols+2), dtype=bool)
+    valid[1:-1,1:-1] = grid >= 0
+    center = valid[1:-1,1:-1]
+    
+    def shifted(d_row, d_col):
+        return valid[1+d_row:rows+1+d_row, 1+d_col:cols+1+d_col]
+    
+    masks = np.zeros((rows, cols), dtype=np.uint8)
+    directions = DIRECTIONS if octile else DIRECTIONS[:4]
+    for bit, (d_row, d_col) in enumerate(directions):
+        mask = center & shifted(d_row, d_col)
+        if d_row and d_col:
+            mask &= shifted(d_row, 0) & shifted(0, d_col)
+        masks |= mask.astype(np.uint8) << bit
+    return masks
+
+
+def to_csr(grid, octile=False):
+    """
+    ===========================================================================
+     Description: Compile the Grid into CSR Adjacency Arrays.
+    ---------------------------------------------------------------------------
+        Neighbors of Idd are indices[indptr[idd]:indptr[idd+1]] in the order
+         of get_neighbors() (UP, RIGHT, DOWN, LEFT) followed by the Diagonals
+         if octile (UP-RIGHT, DOWN-RIGHT, DOWN-LEFT, UP-LEFT), as allowed by
+         the Direction Masks. Blocked Cells have no Neighbors.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Serialized Grid.
+        2. octile : bool (8-connected, else 4-connected).
+    ===========================================================================
+     Return: indptr, indices : Numpy Arrays of int.
+    ===========================================================================
+    """
+    rows, cols = grid.shape
+    masks = get_masks(grid, octile)
+    directions = DIRECTIONS if octile else DIRECTIONS[:4]
+    idds = np.arange(rows*cols, dtype=np.int64).reshape(rows, cols)
+    dtype = np.int32 if (rows*cols < 2**31) else np.int64
+    neighbors = np.zeros((rows, cols, len(directions)), dtype=dtype)
+    mask = np.zeros((rows, cols, len(directions)), dtype=bool)
+    for bit, (d_row, d_col) in enumerate(directions):
+        neighbors[...,bit] = idds + d_row*cols + d_col
+        mask[...,bit] = (masks >> bit) & 1
+    indptr = np.zeros(rows*cols+1, dtype=np.int64)
+    np.cumsum(mask.reshape(-1,len(directions)).sum(axis=1), out=indptr[1:])
+    indices = neighbors[mask]
+    return indptr, indices
+
+
+def to_weights(grid, indptr, indices, costs=None):
+    """
+    ===========================================================================
+     Description: Return the Costs of the CSR Edges: Length of the Move (1
+                   straight, sqrt(2) diagonal) times the Cost of the entered
+                   Cell.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Serialized Grid.
+        2. indptr : Numpy Array of int (CSR Row Pointers).
+        3. indices : Numpy Array of int (CSR Neighbors).
+        4. costs : Numpy Array of float (Cell Costs, Shape of the Grid) or
+                    None (all Cells cost 1).
+    ===========================================================================
+     Return: Numpy Array of float64.
+    ===========================================================================
+    """
+    cols = grid.shape[1]
+    sources = np.repeat(np.arange(len(indptr)-1), np.diff(indptr))
+    diagonal = (sources // cols != indices // cols) & (sources % cols != indices % cols)
+    weights = np.where(diagonal, SQRT2, 1.0)
+    if costs is not None:
+        weights *= np.asarray(costs, dtype=np.float64).ravel()[indices]
+    return weights
+
+
+def dict_to_costs(grid, dict_w):
+    """
+    ===========================================================================
+     Description: Return Cell Costs from a Dictionary of Weights by Idd
+                   (ex: gen_dict_weights()), 1 for the missing Idds.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Serialized Grid.
+        2. dict_w : dict int:float (Node.idd : Weight).
+    ===========================================================================
+     Return: Numpy Array of float64 (Shape of the Grid).
+    ===========================================================================
+    """
+    costs = np.ones(grid.size, dtype=np.float64)
+    idds = np.fromiter(dict_w.keys(), dtype=np.int64, count=len(dict_w))
+    costs[idds] = np.fromiter(dict_w.values(), dtype=np.float64, count=len(dict_w))
+    return costs.reshape(grid.shape)
+
+
+def to_components(indptr, indices):
+    """
+    ===========================================================================
+     Description: Label the Connected Components of the CSR Graph.
+    ---------------------------------------------------------------------------
+        Vectorized Union-Find: every Round hooks the Root of each Edge's
+         larger Label to the smaller one and compresses the Pointers, until
+         both ends of every Edge have the same Root (O(log Cells) Rounds).
+        Blocked Cells have no Edges, so each is a Component of its own.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. indptr : Numpy Array of int (CSR Row Pointers, size+1).
+        2. indices : Numpy Array of int (CSR Neighbors).
+    ===========================================================================
+     Return: Numpy Array of int32 (Component Label by Idd, 0,1,2...).
+    ===========================================================================
+    """
+    size = len(indptr) - 1
+    labels = np.arange(size, dtype=np.int64)
+    a = np.repeat(labels, np.diff(indptr))
+    b = np.asarray(indices, dtype=np.int64)
+    # Each undirected Edge is stored twice, keep one Direction
+    a, b = a[a < b], b[a < b]
+    while True:
+        root_a = labels[a]
+        root_b = labels[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        root_a = root_a[differ]
+        root_b = root_b[differ]
+        a = a[differ]
+        b = b[differ]
+        np.minimum.at(labels, np.maximum(root_a, root_b),
+                      np.minimum(root_a, root_b))
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+    return np.unique(labels, return_inverse=True)[1].astype(np.int32)
 
 
 def to_course(grid, idd_1, idd_2):
@@ -327,11 +492,13 @@ def remove_deadlocks(grid):
      Return: 2D Binary Numpy Array without Deadlocks.
     ===========================================================================
     """
-    for row in range(grid.shape[0]):
-        for col in range(grid.shape[1]):
-            if grid[row][col] >= 0:
-                if not get_neighbors(grid, row, col):
-                    grid[row][col] = -1
+    valid = grid >= 0
+    neighbors = np.zeros(grid.shape, dtype=int)
+    neighbors[1:,:] += valid[:-1,:]
+    neighbors[:-1,:] += valid[1:,:]
+    neighbors[:,1:] += valid[:,:-1]
+    neighbors[:,:-1] += valid[:,1:]
+    grid[valid & (neighbors == 0)] = -1
     return grid
     
 
@@ -375,14 +542,8 @@ def serialize(grid):
      Return: Serialized Numpy 2D Array.
     ===========================================================================
     """
-    counter = 0
-    for row in range(grid.shape[0]):
-        for col in range(grid.shape[1]):
-            if grid[row][col] >= 0:
-                grid[row][col] = counter
-            else:
-                grid[row][col] = -1
-            counter += 1
+    idds = np.arange(grid.size).reshape(grid.shape)
+    grid[...] = np.where(grid >= 0, idds, -1)
     return grid
 
 
@@ -438,11 +599,96 @@ def manhattan_distance(grid, idd_1, idd_2):
     return abs(row_1 - row_2) + abs(col_1 - col_2)
 
 
-def get_dic_h(grid, goal, lookup=dict(), with_pathmax=False):
+def octile_distance(grid, idd_1, idd_2):
+    """
+    ===========================================================================
+     Description: Return Octile Distance between 2 Nodes (8-connected Moves
+                   with sqrt(2) Diagonals and no Obstacles).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Grid
+        2. idd_1 : int (Node's Id)
+        3. idd_2 : int (Node's Id)
+    ===========================================================================
+    """
+    row_1, col_1 = to_row_col(grid, idd_1)
+    row_2, col_2 = to_row_col(grid, idd_2)
+    d_row = abs(row_1 - row_2)
+    d_col = abs(col_1 - col_2)
+    return max(d_row, d_col) + (SQRT2 - 1) * min(d_row, d_col)
+
+
+def get_table_h(grid, goal, lookup=None, with_pathmax=False):
+    """
+    ===========================================================================
+     Description: Return Table of the Heuristic of every Cell to the Goal:
+                   Manhattan Distance, replaced by the accurate Distance of
+                   the Lookup Cells (and raised by Pathmax if required).
+    ---------------------------------------------------------------------------
+        Pathmax runs a Worklist from the Lookup Cells: each Round raises
+         the Neighbors of the Worklist to (h-1) where they are lower, and
+         the raised Neighbors are the next Worklist, until no Cell is
+         raised (Convergence). The Rounds are vectorized over the CSR.
+    ---------------------------------------------------------------------------
+        pathmaxed_nodes counts the Worklist Cells summed over the Rounds.
+         It differs from the former in-place Loop (19 Rounds at most, each
+         Round seeing the Cells already raised in it), which reports other
+         Counts on many Grids and could stop before Convergence (lower hs).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. grid : Serialized Grid.
+        2. goal : int (Goal Idd).
+        3. lookup : dict int:int (Node.idd : accurate distance) or None.
+        4. with_pathmax : bool (Propagate the Lookup by Pathmax).
+    ===========================================================================
+     Return:
+    ---------------------------------------------------------------------------
+        1. hs : Numpy Array of int (H by Idd, -1 for Blocked Cells).
+        2. is_exact : Numpy Array of bool (True for the Lookup Cells).
+        3. pathmaxed_nodes : int (Amount of processed Worklist Nodes, only
+                                   if with_pathmax=True).
+    ===========================================================================
+    """
+    if lookup is None:
+        lookup = dict()
+    row_goal, col_goal = to_row_col(grid, goal)
+    rows, cols = np.indices(grid.shape)
+    hs = (np.abs(rows - row_goal) + np.abs(cols - col_goal)).ravel()
+    valid = (grid >= 0).ravel()
+    hs[~valid] = -1
+    is_exact = np.zeros(grid.size, dtype=bool)
+    idds = np.fromiter(lookup.keys(), dtype=np.int64, count=len(lookup))
+    hs[idds] = np.fromiter(lookup.values(), dtype=np.int64, count=len(lookup))
+    is_exact[idds] = True
+    
+    if not with_pathmax: return hs, is_exact
+    
+    indptr, indices = to_csr(grid)
+    worklist = idds
+    pathmaxed_nodes = 0
+    while worklist.size:
+        pathmaxed_nodes += len(worklist)
+        firsts = indptr[worklist]
+        counts = indptr[worklist+1] - firsts
+        shifts = np.repeat(firsts - (np.cumsum(counts) - counts), counts)
+        neighbors = indices[shifts + np.arange(int(counts.sum()))]
+        hs_new = np.repeat(hs[worklist], counts) - 1
+        raised = hs_new > hs[neighbors]
+        neighbors = neighbors[raised]
+        np.maximum.at(hs, neighbors, hs_new[raised])
+        is_exact[neighbors] = False
+        worklist = np.unique(neighbors)
+        
+    return hs, is_exact, pathmaxed_nodes
+
+
+def get_dic_h(grid, goal, lookup=None, with_pathmax=False):
     """
     ===========================================================================
      Description: Return a Dictionary of Nodes of the Grid with their
-                     Manhattan Distance to the Goal.
+                     Manhattan Distance to the Goal (by get_table_h()).
     ===========================================================================
      Arguments:
     ---------------------------------------------------------------------------
@@ -453,63 +699,12 @@ def get_dic_h(grid, goal, lookup=dict(), with_pathmax=False):
      Return: dict int:(int,bool) (Node.idd : (h,is_lookup).
     ===========================================================================
     """        
-    row_goal, col_goal = to_row_col(grid, goal)
-    dic = dict()
-    for row in range(grid.shape[0]):
-        for col in range(grid.shape[1]):
-            idd = to_idd(grid,row,col)
-            if not is_valid_idd(grid, idd): continue
-            if (idd in lookup):
-                dic[idd] = (lookup[idd],True)
-            else:
-                h = abs(row_goal - row) + abs(col_goal - col)
-                dic[idd] = (h,False)
-                
+    res = get_table_h(grid, goal, lookup, with_pathmax)
+    hs, is_exact = res[0], res[1]
+    idds = np.flatnonzero(hs >= 0).tolist()
+    dic = dict(zip(idds, zip(hs[idds].tolist(), is_exact[idds].tolist())))
     if not with_pathmax: return dic
-    
-    """
-    rebels = set()
-    for idd in lookup:
-        row, col = to_row_col(grid, idd)
-        neighbors = get_neighbors(grid, row, col)
-        for neighbor in neighbors:
-            if dic[neighbor][0] < dic[idd][0]-1:
-                dic[neighbor] = (dic[idd][0]-1,False)
-                rebels.add(neighbor)
-    pathmaxed_nodes = len(lookup)
-    while rebels:
-        idd = rebels.pop()
-        row, col = to_row_col(grid, idd)
-        neighbors = get_neighbors(grid, row, col)
-        for neighbor in neighbors:           
-            if dic[neighbor][0] < dic[idd][0]-1:
-                dic[neighbor] = (dic[idd][0]-1,False)
-                rebels.add(neighbor)
-        pathmaxed_nodes += 1                                
-    """
-    
-    rebels = set()
-    for idd in lookup:
-        row, col = to_row_col(grid, idd)
-        neighbors = get_neighbors(grid, row, col)
-        for neighbor in neighbors:
-            if dic[neighbor][0] < dic[idd][0]-1:
-                dic[neighbor] = (dic[idd][0]-1,False)
-                rebels.add(neighbor)
-    pathmaxed_nodes = len(lookup)
-    for i in range(19):
-        rebels_temp = rebels.copy()
-        rebels.clear()
-        for idd in rebels_temp:
-            row, col = to_row_col(grid, idd)
-            neighbors = get_neighbors(grid, row, col)
-            for neighbor in neighbors:
-                if dic[neighbor][0] < dic[idd][0]-1:
-                    dic[neighbor] = (dic[idd][0]-1,False)
-                    rebels.add(neighbor)
-        pathmaxed_nodes += len(rebels_temp)   
-        
-    return dic, pathmaxed_nodes               
+    return dic, res[2]
 
 
 def to_csv(grid, fr, lr, fc, lc, path):
@@ -550,7 +745,9 @@ def to_csv(grid, fr, lr, fc, lc, path):
 """
 def tester():
     
+    import os
     import sys
+    import tempfile
     
     def tester_gen_symmetric_grid():
         grid = gen_symmetric_grid(2)        
@@ -738,8 +935,92 @@ def tester():
             print('OK: {0}'.format(fname))
         else:
             print('Failed: {0}'.format(fname))
-            
-    
+
+
+    def tester_to_csr():
+        li_1 = [-1,  1, -1]
+        li_2 = [ 3,  4,  5]
+        li_3 = [-1,  7, -1]
+        lists = [li_1, li_2, li_3]
+        grid = np.array(lists)
+        indptr, indices = to_csr(grid)
+
+        p1 = (indptr.tolist() == [0,0,1,1,2,6,7,7,8,8])
+        p2 = (indices[indptr[4]:indptr[5]].tolist() == [1,5,7,3])
+        p3 = (indices[indptr[5]:indptr[6]].tolist() == [4])
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_octile():
+        li_1 = [ 0,  1,  2]
+        li_2 = [ 3,  4, -1]
+        li_3 = [ 6,  7,  8]
+        grid = np.array([li_1, li_2, li_3])
+        masks = get_masks(grid, True)
+        # 4 -> UP, DOWN, LEFT, UP-LEFT, DOWN-LEFT (no Corner Cutting by 5)
+        p1 = masks[1][1] == 0b11001101
+        indptr, indices = to_csr(grid, True)
+        p2 = (indices[indptr[4]:indptr[5]].tolist() == [1,7,3,6,0])
+        p3 = (indices[indptr[1]:indptr[2]].tolist() == [2,4,0,3])
+        weights = to_weights(grid, indptr, indices)
+        p4 = (weights[indptr[4]:indptr[5]].tolist() == [1,1,1,SQRT2,SQRT2])
+        p5 = abs(octile_distance(grid,0,7) - (1+SQRT2)) < 1e-9
+        p6 = (get_masks(grid) == get_masks(grid, True) & 0b1111).all()
+        costs = dict_to_costs(grid, {3:2, 6:5})
+        weights = to_weights(grid, indptr, indices, costs)
+        p6 = p6 and (weights[indptr[4]:indptr[5]].tolist() ==
+                     [1,1,2,5*SQRT2,SQRT2])
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5 and p6):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_to_components():
+        grid = np.array([[0,0,-1,0],
+                         [-1,0,-1,0],
+                         [0,-1,0,0]])
+        grid = serialize(grid)
+        labels = to_components(*to_csr(grid))
+        p1 = labels[0] == labels[1] == labels[5]
+        p2 = labels[3] == labels[7] == labels[11] == labels[10]
+        p3 = labels[0] != labels[3] and labels[8] not in (labels[0], labels[3])
+        p4 = True
+        for i in range(20):
+            grid = gen_obstacles_grid(15,40)
+            labels = to_components(*to_csr(grid))
+            # Neighbors share the Label
+            indptr, indices = to_csr(grid)
+            a = np.repeat(np.arange(grid.size), np.diff(indptr))
+            if (labels[a] != labels[indices]).any():
+                p4 = False
+            # Flood Fill from each Valid Idd reaches exactly its Label
+            idd = get_valid_idds(grid)[0]
+            seen = {idd}
+            stack = [idd]
+            while stack:
+                x = stack.pop()
+                for y in indices[indptr[x]:indptr[x+1]].tolist():
+                    if y not in seen:
+                        seen.add(y)
+                        stack.append(y)
+            if (set(np.flatnonzero(labels == labels[idd]).tolist()) != seen):
+                p4 = False
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+        
+        
     def tester_to_course():
         li_1 = [-1,  1, -1]
         li_2 = [ 3,  4,  5]
@@ -992,8 +1273,28 @@ def tester():
             print('Failed: {0}'.format(fname))
             
             
+    def tester_get_table_h():
+        # Corridor: Pathmax has to run more than 19 Rounds to converge
+        grid = serialize(np.zeros((1,40), dtype=int))
+        hs, is_exact = get_table_h(grid,39)
+        p1 = hs.tolist() == list(range(39,-1,-1)) and not is_exact.any()
+        hs, is_exact, pathmaxed_nodes = get_table_h(grid,39,{0:80},True)
+        p2 = hs.tolist() == list(range(80,40,-1))
+        p3 = is_exact.tolist() == [True] + [False]*39
+        p4 = pathmaxed_nodes == 40
+        grid[0][5] = -1
+        hs, is_exact = get_table_h(grid,39)
+        p5 = hs[5] == -1
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3 and p4 and p5):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+            
+            
     def tester_to_csv():
-        path = 'C:\\Temp\\to_csv.csv'
+        path = os.path.join(tempfile.gettempdir(), 'to_csv.csv')
         grid = gen_symmetric_grid(5)
         sub_grid = grid[1:4,1:4]
         to_csv(grid,1,3,1,3,path)
@@ -1028,6 +1329,9 @@ def tester():
     tester_is_valid_idd()
     tester_get_valid_idds()
     tester_get_neighbors()
+    tester_to_csr()
+    tester_octile()
+    tester_to_components()
     tester_to_course()
     tester_to_next_idd()
     tester_remove_deadlocks()
@@ -1038,6 +1342,7 @@ def tester():
     tester_xor()
     tester_manhattan_distance()
     tester_get_dic_h()
+    tester_get_table_h()
     #tester_to_csv()
     print('====================\nEnd Tester\n====================')
     
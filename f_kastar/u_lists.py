@@ -60,12 +60,14 @@ def count_rows_cols(lists):
 ===============================================================================
 ===============================================================================
 """
+import os
 import sys
+import tempfile
 
 def tester():
     
     def tester_to_lists_mask():
-        path = 'C:\\Temp\\temp.map'
+        path = os.path.join(tempfile.gettempdir(), 'temp.map')
         
         file = open(path, 'w')
         file.write('abcde\n')
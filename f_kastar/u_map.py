@@ -0,0 +1,285 @@
+import zipfile
+import numpy as np
+
+
+# Passable Terrain of the MovingAI Maps ('T' Trees and '@' Walls are Blocked)
+CHARS_VALID = '.GS'
+
+# Example Cell Costs of weighted Terrain (Trees, Swamps and Water passable)
+COSTS = {'.': 1, 'G': 1, 'S': 3, 'W': 5, 'T': 2}
+
+
+def read(path):
+    """
+    ===========================================================================
+     Description: Return the Content of a Map File as Bytes.
+    ---------------------------------------------------------------------------
+        Reads a plain .map File or the .map Member of a .zip Archive
+         (the first Member if no Member ends with .map).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the .map or .map.zip File).
+    ===========================================================================
+     Return: bytes
+    ===========================================================================
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            maps = [name for name in names if name.endswith('.map')]
+            return archive.read(maps[0] if maps else names[0])
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def parse_header(data):
+    """
+    ===========================================================================
+     Description: Parse the MovingAI Header (type, height, width, map).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. data : bytes (Content of the Map File).
+    ===========================================================================
+     Return:
+    ---------------------------------------------------------------------------
+        1. header : dict str:str|int ('type', 'height', 'width').
+        2. offset : int (Offset of the first Terrain Row in the Data).
+    ===========================================================================
+    """
+    header = dict()
+    offset = 0
+    while True:
+        end = data.find(b'\n', offset)
+        if (end == -1):
+            raise ValueError('MovingAI map has no "map" line')
+        line = data[offset:end].strip().decode('ascii')
+        offset = end + 1
+        if (line == 'map'):
+            break
+        if not line:
+            continue
+        key, value = line.split(None, 1)
+        header[key] = int(value) if value.isdigit() else value
+    return header, offset
+
+
+def to_grid(data, chars_valid=CHARS_VALID):
+    """
+    ===========================================================================
+     Description: Convert the Content of a Map File to Grid [0,-1].
+    ---------------------------------------------------------------------------
+        The Terrain is read as one Buffer and masked by a Lookup Table of
+         the Chars, without intermediate List of Lists.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. data : bytes (Content of the Map File).
+        2. chars_valid : str (Passable Chars - Mask as 0).
+    ===========================================================================
+     Return: 2D Numpy Array of [0,-1] (ready to be serialized).
+    ===========================================================================
+    """
+    lookup = np.full(256, -1, dtype=int)
+    lookup[np.frombuffer(chars_valid.encode('ascii'), dtype=np.uint8)] = 0
+    return lookup[_to_terrain(data)]
+
+
+def to_costs(data, costs=COSTS):
+    """
+    ===========================================================================
+     Description: Convert the Content of a Map File to Cell Costs.
+    ---------------------------------------------------------------------------
+        Same Lookup Table as to_grid(), filled with the Costs of the Chars.
+         Chars without a Cost are Blocked (Cost 0, and -1 by to_grid()
+         with chars_valid=''.join(costs)).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. data : bytes (Content of the Map File).
+        2. costs : dict str:float (Char : Cost of entering its Cell).
+    ===========================================================================
+     Return: 2D Numpy Array of float64.
+    ===========================================================================
+    """
+    lookup = np.zeros(256, dtype=np.float64)
+    chars = np.frombuffer(''.join(costs).encode('ascii'), dtype=np.uint8)
+    lookup[chars] = list(costs.values())
+    return lookup[_to_terrain(data)]
+
+
+def _to_terrain(data):
+    """
+    ===========================================================================
+     Description: Return the Terrain Chars of a Map File as 2D uint8 Array.
+    ---------------------------------------------------------------------------
+        The Terrain is read as one Buffer (Rows of irregular length are
+         padded by '@' or cut to the Width).
+    ===========================================================================
+    """
+    header, offset = parse_header(data)
+    height = header['height']
+    width = header['width']
+    body = data[offset:].replace(b'\r', b'')
+    if (len(body) < height * (width+1)):
+        body = body + b'\n'
+    terrain = np.frombuffer(body, dtype=np.uint8)
+    if (len(terrain) >= height * (width+1)):
+        terrain = terrain[:height*(width+1)].reshape(height, width+1)
+    if (terrain.ndim != 2) or (terrain[:,width] != ord('\n')).any():
+        # Rows of irregular length: pad or cut each Row to the Width
+        lines = body.split(b'\n')[:height]
+        lines = [line[:width].ljust(width, b'@') for line in lines]
+        terrain = np.frombuffer(b''.join(lines), dtype=np.uint8)
+        terrain = terrain.reshape(len(lines), width)
+    return terrain[:,:width]
+
+
+def load_map(path, chars_valid=CHARS_VALID):
+    """
+    ===========================================================================
+     Description: Load MovingAI Map (.map or .map.zip) as Grid [0,-1].
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the Map File).
+        2. chars_valid : str (Passable Chars - Mask as 0).
+    ===========================================================================
+     Return: 2D Numpy Array of [0,-1] (ready to be serialized).
+    ===========================================================================
+    """
+    return to_grid(read(path), chars_valid)
+
+
+def load_header(path):
+    """
+    ===========================================================================
+     Description: Return the Header of the MovingAI Map.
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the Map File).
+    ===========================================================================
+     Return: dict str:str|int ('type', 'height', 'width').
+    ===========================================================================
+    """
+    return parse_header(read(path))[0]
+
+
+
+def load_scen(path):
+    """
+    ===========================================================================
+     Description: Load MovingAI Scenario (.scen or .scen.zip).
+    ---------------------------------------------------------------------------
+        Each Line: bucket, map, width, height, start x, start y, goal x,
+         goal y, optimal length (x is the Col and y is the Row).
+    ===========================================================================
+     Arguments:
+    ---------------------------------------------------------------------------
+        1. path : str (Path to the Scenario File).
+    ===========================================================================
+     Return: list of tuple (bucket, start, goal, optimal) : (int, int, int,
+              float) where start and goal are Idds in the Map's Grid.
+    ===========================================================================
+    """
+    scen = list()
+    for line in read(path).decode('ascii').splitlines():
+        vals = line.split()
+        if (len(vals) < 9) or (vals[0] == 'version'):
+            continue
+        bucket = int(vals[0])
+        width = int(vals[-7])
+        col_start, row_start, col_goal, row_goal = [int(x) for x in vals[-5:-1]]
+        start = row_start*width + col_start
+        goal = row_goal*width + col_goal
+        scen.append((bucket, start, goal, float(vals[-1])))
+    return scen
+
+
+"""
+===============================================================================
+===============================================================================
+=======           Tester           ============================================
+===============================================================================
+===============================================================================
+"""
+def tester():
+
+    import sys
+
+    def tester_to_grid():
+        data = b'type octile\nheight 3\nwidth 4\nmap\n.T@.\nGS..\n@@@.\n'
+        grid = to_grid(data)
+        grid_true = np.array([[0,-1,-1,0],[0,0,0,0],[-1,-1,-1,0]])
+        p1 = (grid == grid_true).all()
+
+        data = data.replace(b'\n', b'\r\n')
+        p2 = (to_grid(data) == grid_true).all()
+
+        grid = to_grid(data, '.T')
+        p3 = (grid[0] == [0,0,-1,0]).all() and (grid[1] == [-1,-1,0,0]).all()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_to_costs():
+        data = b'type octile\nheight 2\nwidth 3\nmap\n.TW\n@S.\n'
+        costs = to_costs(data)
+        p1 = costs.tolist() == [[1,2,5],[0,3,1]]
+        grid = to_grid(data, ''.join(COSTS))
+        p2 = ((grid == 0) == (costs > 0)).all()
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_load_map():
+        path = 'lak102d.map.zip'
+        header = load_header(path)
+        grid = load_map(path)
+        p1 = header == {'type':'octile', 'height':30, 'width':38}
+        p2 = grid.shape == (30,38)
+        p3 = (grid == 0).sum() == 519
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (p1 and p2 and p3):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    def tester_load_scen():
+        import os
+        import tempfile
+        path = os.path.join(tempfile.mkdtemp(), 'temp.map.scen')
+        file = open(path, 'w')
+        file.write('version 1\n')
+        file.write('0\ttemp.map\t4\t3\t1\t2\t3\t0\t3.82842712\n')
+        file.close()
+        scen = load_scen(path)
+
+        fname = sys._getframe().f_code.co_name[7:]
+        if (scen == [(0, 9, 3, 3.82842712)]):
+            print('OK: {0}'.format(fname))
+        else:
+            print('Failed: {0}'.format(fname))
+
+
+    print('\n====================\nStart Tester\n====================')
+    tester_to_grid()
+    tester_to_costs()
+    tester_load_map()
+    tester_load_scen()
+    print('====================\nEnd Tester\n====================')
+
+
+#tester()